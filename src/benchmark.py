@@ -0,0 +1,295 @@
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import platform
+import tempfile
+import numpy as np
+import pandas as pd
+import sklearn
+from config_loader import load_config, ProfilingConfig
+from profiling import configure_profiling, profile_stage, stop_profiling
+from data_preprocessing.data_preprocessor import DataPreprocessor
+from data_preprocessing.feature_selection import clear_ranking_cache
+
+BENCHMARKS = ("preprocess", "preprocess_low_memory", "train", "predict")
+DEFAULT_SIZES = (1000, 10000, 50000)
+TARGET_COLUMN = "target"
+
+@dataclasses.dataclass(frozen=True)
+class DatasetSpec:
+    numeric_columns: int = 10
+    categorical_columns: int = 3
+    cardinality: int = 10
+    missing_rate: float = 0.1
+    skew: float = 1.0
+    task: str = "classification"
+    random_state: int = 0
+
+def make_dataset(rows, spec):
+    """Generates a reproducible synthetic dataset with a `target` column, without any download.
+
+    Numerical columns are lognormal with sigma `skew` (normal when `skew` is 0), categorical
+    columns have `cardinality` levels with Zipf-like frequencies, and every feature cell is
+    missing with probability `missing_rate`. The target depends on both kinds of columns.
+    """
+    rng = np.random.default_rng(spec.random_state)
+    numeric = rng.standard_normal((rows, spec.numeric_columns))
+    signal = numeric @ rng.standard_normal(spec.numeric_columns)
+    if spec.skew > 0:
+        numeric = np.exp(spec.skew * numeric)
+    data = pd.DataFrame(numeric, columns=[f"num{i}" for i in range(spec.numeric_columns)])
+
+    weights = 1.0 / np.arange(1, spec.cardinality + 1)
+    for i in range(spec.categorical_columns):
+        codes = rng.choice(spec.cardinality, size=rows, p=weights / weights.sum())
+        signal += rng.standard_normal(spec.cardinality)[codes]
+        data[f"cat{i}"] = np.array([f"c{i}_{level}" for level in range(spec.cardinality)], dtype=object)[codes]
+
+    if spec.missing_rate > 0:
+        data = data.mask(rng.random(data.shape) < spec.missing_rate)
+    signal += rng.normal(scale=0.5, size=rows)
+    if spec.task == "classification":
+        data[TARGET_COLUMN] = np.where(signal > np.median(signal), "yes", "no")
+    else:
+        data[TARGET_COLUMN] = signal
+    return data
+
+def benchmark_config(config, generations=1, population_size=4, time_budget_seconds=60):
+    """Returns `config` with caches, reports and profiling off and a small single-process TPOT search.
+
+    Caches would make repeated runs measure the cache instead of the code, and a search
+    in-process keeps its memory visible to tracemalloc.
+    """
+    search = dataclasses.replace(config.training.search, generations=generations, population_size=population_size,
+                                 time_budget_seconds=time_budget_seconds, n_jobs=1, resume=False, verbosity=0)
+    selection = config.feature_engineering.feature_selection
+    selection = dataclasses.replace(selection, model_based=dataclasses.replace(selection.model_based, cache_dir=None))
+    return dataclasses.replace(
+        config,
+        feature_engineering=dataclasses.replace(config.feature_engineering, feature_selection=selection),
+        training=dataclasses.replace(config.training, search=search),
+        data_loading=dataclasses.replace(config.data_loading, cache_dir=None),
+        reporting=dataclasses.replace(config.reporting, enabled=False),
+        profiling=ProfilingConfig(),
+        stage_cache=dataclasses.replace(config.stage_cache, enabled=False))
+
+def run_benchmarks(sizes, spec, config, logger, benchmarks=BENCHMARKS, repeats=1, chunksize=None):
+    """Runs the benchmarks at every size and returns one result per (rows, stage).
+
+    Every profiled stage of a benchmark is reported as `<benchmark>:<stage>`. Times are the
+    best of `repeats` runs; peak memory comes from one extra run with tracemalloc, which
+    would otherwise inflate the times.
+    """
+    # Imported here so the preprocessing benchmarks run without TPOT.
+    from inference import DEFAULT_CHUNKSIZE, predict_file
+    from training import train
+
+    low_memory_config = dataclasses.replace(config, low_memory=dataclasses.replace(config.low_memory, enabled=True))
+    results = []
+    for rows in sizes:
+        data = make_dataset(rows, spec)
+        with tempfile.TemporaryDirectory(prefix="automlforge-benchmark-") as work_dir:
+            data_path = os.path.join(work_dir, "data.csv")
+            data.to_csv(data_path, index=False)
+            pipeline_path = None
+
+            def preprocess(preprocess_config):
+                features, target = data.drop(columns=TARGET_COLUMN), data[TARGET_COLUMN]
+                preprocessor = DataPreprocessor(config=preprocess_config)
+                with profile_stage("fit", features):
+                    preprocessor.fit_transform(features, target)
+                with profile_stage("transform", features):
+                    preprocessor.transform(features)
+                # Regression check: a streamed chunk whose categorical columns are all empty is read as float64.
+                empty = features.head(100).assign(**dict.fromkeys(features.select_dtypes(exclude=np.number).columns,
+                                                                  np.nan))
+                preprocessor.transform(empty)
+
+            def train_model():
+                nonlocal pipeline_path
+                with profile_stage("train"):
+                    artifact = train(data_path, TARGET_COLUMN, config, output_dir=work_dir, logger=logger)
+                pipeline_path = artifact.pipeline_path
+
+            def predict():
+                output_path = os.path.join(work_dir, "predictions.csv")
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                with profile_stage("predict", data):
+                    predict_file(pipeline_path, data_path, output_path, logger, chunksize or DEFAULT_CHUNKSIZE)
+
+            runs = {"preprocess": lambda: preprocess(config),
+                    "preprocess_low_memory": lambda: preprocess(low_memory_config),
+                    "train": train_model, "predict": predict}
+            for name in benchmarks:
+                if name == "predict" and pipeline_path is None:
+                    # Trained outside the profiler, so the model is not part of the predict timings.
+                    train_model()
+                logger.info(f"Benchmarking {name} on {rows} rows.")
+                results.extend(_measure(name, runs[name], rows, logger, repeats))
+    return results
+
+def compare_to_baseline(results, baseline, tolerance=0.25, min_seconds=0.05, min_mb=1.0):
+    """Flags stages whose time or peak memory grew by more than `tolerance` over the baseline.
+
+    Changes below `min_seconds` or `min_mb` are ignored as noise. Stages missing from the
+    baseline are not compared.
+    """
+    previous = {(result["rows"], result["stage"]): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["rows"], result["stage"]))
+        if before is None:
+            continue
+        for metric, min_change in (("seconds", min_seconds), ("peak_mb", min_mb)):
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new - old > max(tolerance * old, min_change):
+                regressions.append({"rows": result["rows"], "stage": result["stage"], "metric": metric,
+                                    "baseline": old, "current": new, "change": (new - old) / old if old else None})
+    return regressions
+
+def compare_low_memory(results):
+    """Pairs the peak memory of the default and low-memory preprocessing for every size and phase."""
+    peaks = {(result["rows"], result["stage"]): result["peak_mb"] for result in results}
+    comparisons = []
+    for (rows, stage), peak in peaks.items():
+        if not stage.startswith("preprocess:") or stage.count("/"):
+            continue
+        low_memory_peak = peaks.get((rows, stage.replace("preprocess:", "preprocess_low_memory:")))
+        if peak is not None and low_memory_peak is not None:
+            comparisons.append({"rows": rows, "phase": stage.split(":", 1)[1], "default_peak_mb": peak,
+                                "low_memory_peak_mb": low_memory_peak})
+    return comparisons
+
+def environment():
+    """Describes the machine and library versions the results were measured with."""
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "numpy": np.__version__, "pandas": pd.__version__, "scikit-learn": sklearn.__version__}
+
+def _measure(name, run, rows, logger, repeats):
+    timings = []
+    for _ in range(repeats):
+        timings.append(_aggregate(_profiled(run, logger, trace_memory=False)))
+    traced = _aggregate(_profiled(run, logger, trace_memory=True))
+
+    results = []
+    for stage, stats in traced.items():
+        seconds = min([timing[stage]["seconds"] for timing in timings if stage in timing] or [stats["seconds"]])
+        stage_rows = stats["rows"] or rows
+        results.append({"rows": rows, "stage": f"{name}:{stage}", "calls": stats["calls"],
+                        "seconds": round(seconds, 6),
+                        "latency_ms": round(seconds / stats["calls"] * 1000, 3),
+                        "rows_per_second": round(stage_rows / seconds, 1) if seconds > 0 else None,
+                        "peak_mb": stats["peak_mb"]})
+    return results
+
+def _profiled(run, logger, trace_memory):
+    clear_ranking_cache()
+    configure_profiling(ProfilingConfig(enabled=True, trace_memory=trace_memory), logger)
+    try:
+        run()
+    finally:
+        profiler = stop_profiling()
+    return profiler.records
+
+def _aggregate(records):
+    """Sums the records of each stage name; `rows` is the total number of input rows, when known."""
+    stages = {}
+    for record in records:
+        stats = stages.setdefault(record["name"], {"seconds": 0.0, "calls": 0, "rows": 0, "peak_mb": None})
+        stats["seconds"] += record["wall_s"]
+        stats["calls"] += 1
+        if record["input_shape"]:
+            stats["rows"] += record["input_shape"][0]
+        if "peak_traced_mb" in record:
+            stats["peak_mb"] = max(stats["peak_mb"] or 0.0, record["peak_traced_mb"])
+    return stages
+
+def _print_results(results, regressions, comparisons=()):
+    flagged = {(regression["rows"], regression["stage"]) for regression in regressions}
+    print(f"{'rows':>8}  {'stage':<42} {'seconds':>10} {'rows/s':>12} {'peak MB':>9}")
+    for result in results:
+        rate = f"{result['rows_per_second']:.0f}" if result["rows_per_second"] else "-"
+        peak = f"{result['peak_mb']:.1f}" if result["peak_mb"] is not None else "-"
+        mark = "  REGRESSION" if (result["rows"], result["stage"]) in flagged else ""
+        print(f"{result['rows']:>8}  {result['stage']:<42} {result['seconds']:>10.4f} {rate:>12} {peak:>9}{mark}")
+    for comparison in comparisons:
+        default, low = comparison["default_peak_mb"], comparison["low_memory_peak_mb"]
+        change = f" ({(low - default) / default * 100:+.0f}%)" if default else ""
+        print(f"Peak memory of {comparison['phase']} at {comparison['rows']} rows: "
+              f"default {default:.1f} MB, low memory {low:.1f} MB{change}")
+    for regression in regressions:
+        change = f"{regression['change'] * 100:+.0f}%" if regression["change"] is not None else "new"
+        print(f"Regression: {regression['stage']} at {regression['rows']} rows, {regression['metric']} "
+              f"{regression['baseline']} -> {regression['current']} ({change})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AutoMLForge on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Row counts to benchmark.")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=["preprocess"],
+                        help="What to run; train and predict need TPOT.")
+    parser.add_argument("--numeric-columns", type=int, default=DatasetSpec.numeric_columns)
+    parser.add_argument("--categorical-columns", type=int, default=DatasetSpec.categorical_columns)
+    parser.add_argument("--cardinality", type=int, default=DatasetSpec.cardinality,
+                        help="Levels per categorical column.")
+    parser.add_argument("--missing-rate", type=float, default=DatasetSpec.missing_rate,
+                        help="Probability of each feature cell being missing.")
+    parser.add_argument("--skew", type=float, default=DatasetSpec.skew,
+                        help="Lognormal sigma of the numerical columns (0 for normal).")
+    parser.add_argument("--task", choices=("classification", "regression"), default=DatasetSpec.task)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.random_state, help="Seed of the synthetic data.")
+    parser.add_argument("--repeats", type=int, default=3, choices=range(1, 101), metavar="N", help="Timed runs per benchmark; the best is reported.")
+    parser.add_argument("--chunksize", type=int, help="Rows per chunk in the predict benchmark.")
+    parser.add_argument("--generations", type=int, default=1, help="TPOT generations in the train benchmark.")
+    parser.add_argument("--population-size", type=int, default=4, help="TPOT population in the train benchmark.")
+    parser.add_argument("--config", "-c", help="Path to the config YAML file.")
+    parser.add_argument("--output", "-o", default="benchmark_results.json", help="Where to write the results.")
+    parser.add_argument("--baseline", help="Baseline results to compare against.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results to --baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Relative slowdown or memory growth flagged as a regression.")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(__name__)
+    if args.update_baseline and not args.baseline:
+        parser.error("--update-baseline needs --baseline.")
+
+    spec = DatasetSpec(args.numeric_columns, args.categorical_columns, args.cardinality, args.missing_rate,
+                       args.skew, args.task, args.seed)
+    config = benchmark_config(load_config(args.config), args.generations, args.population_size)
+    results = run_benchmarks(args.sizes, spec, config, logger, args.benchmarks, args.repeats, args.chunksize)
+    report = {"environment": environment(),
+              "settings": {"dataset": dataclasses.asdict(spec), "benchmarks": args.benchmarks,
+                           "repeats": args.repeats, "config": dataclasses.asdict(config)},
+              "results": results}
+
+    regressions = []
+    if args.baseline and os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["settings"] != json.loads(json.dumps(report["settings"])):
+            logger.warning("Baseline was recorded with different settings; results may not be comparable.")
+        if baseline["environment"] != report["environment"]:
+            logger.warning("Baseline was recorded on a different machine or library versions.")
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        report["regressions"] = regressions
+
+    comparisons = compare_low_memory(results)
+    if comparisons:
+        report["low_memory"] = comparisons
+    _print_results(results, regressions, comparisons)
+    for path in {args.output, args.baseline if args.update_baseline else None} - {None}:
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Benchmark results saved to: {path}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
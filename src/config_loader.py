@@ -0,0 +1,342 @@
+import dataclasses
+import functools
+import os
+import typing
+from dataclasses import dataclass, field
+import yaml
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "config.yaml")
+
+@dataclass(frozen=True)
+class BinningConfig:
+    enabled: bool = True
+    num_bins: int = 10
+    strategy: str = "quantile"
+
+    def __post_init__(self):
+        _check_choice("feature_engineering.binning.strategy", self.strategy, ("uniform", "quantile", "kmeans"))
+        _check(self.num_bins >= 2, "feature_engineering.binning.num_bins must be at least 2.")
+
+@dataclass(frozen=True)
+class EncodingConfig:
+    categorical_threshold: int = 10
+    default_encoding: str = "onehot"
+    high_cardinality_encoding: str = "hashing"
+    hashing_n_features: int = 16
+    target_encoding_folds: int = 5
+    sparse_output: bool = False
+    random_state: int = 42
+
+    def __post_init__(self):
+        _check_choice("feature_engineering.encoding.default_encoding", self.default_encoding, ("onehot", "label", "target"))
+        _check_choice("feature_engineering.encoding.high_cardinality_encoding", self.high_cardinality_encoding,
+                      ("hashing", "target"))
+        _check(self.categorical_threshold >= 1, "feature_engineering.encoding.categorical_threshold must be positive.")
+        _check(self.hashing_n_features >= 1, "feature_engineering.encoding.hashing_n_features must be positive.")
+        _check(self.target_encoding_folds >= 2, "feature_engineering.encoding.target_encoding_folds must be at least 2.")
+
+@dataclass(frozen=True)
+class InteractionFeaturesConfig:
+    enabled: bool = True
+    pairs: typing.Tuple[typing.Tuple[str, str], ...] = ()
+
+    def __post_init__(self):
+        pairs = tuple(tuple(pair) for pair in self.pairs)
+        _check(all(len(pair) == 2 for pair in pairs), "feature_engineering.interaction_features.pairs must hold column pairs.")
+        object.__setattr__(self, "pairs", pairs)
+
+@dataclass(frozen=True)
+class ModelBasedSelectionConfig:
+    enabled: bool = True
+    num_features: int = 20
+    estimator: str = "random_forest"
+    importance: str = "impurity"
+    n_estimators: int = 100
+    sample_rows: int = 50000
+    permutation_rows: int = 5000
+    permutation_repeats: int = 5
+    n_jobs: int = -1
+    random_state: int = 42
+    cache_dir: typing.Optional[str] = None
+
+    def __post_init__(self):
+        section = "feature_engineering.feature_selection.model_based"
+        _check(self.num_features >= 1, f"{section}.num_features must be positive.")
+        _check_choice(f"{section}.estimator", self.estimator, ("random_forest", "hist_gradient_boosting"))
+        _check_choice(f"{section}.importance", self.importance, ("impurity", "permutation"))
+        _check(self.estimator == "random_forest" or self.importance == "permutation",
+               f"{section}.estimator 'hist_gradient_boosting' requires importance 'permutation'.")
+        _check(self.n_estimators >= 1, f"{section}.n_estimators must be positive.")
+        _check(self.sample_rows >= 2, f"{section}.sample_rows must be at least 2.")
+        _check(self.permutation_rows >= 1, f"{section}.permutation_rows must be positive.")
+        _check(self.permutation_repeats >= 1, f"{section}.permutation_repeats must be positive.")
+        _check(self.n_jobs != 0, f"{section}.n_jobs must not be 0 (use -1 for all cores).")
+
+@dataclass(frozen=True)
+class FeatureSelectionConfig:
+    enabled: bool = True
+    model_based: ModelBasedSelectionConfig = field(default_factory=ModelBasedSelectionConfig)
+
+@dataclass(frozen=True)
+class FeatureGenerationConfig:
+    ranking: str = "correlation"
+    max_candidates: int = 20
+    max_features: int = 200
+    max_memory_mb: typing.Optional[float] = 512
+    block_size: int = 64
+    sample_rows: int = 100000
+    random_state: int = 42
+
+    def __post_init__(self):
+        _check_choice("feature_engineering.feature_generation.ranking", self.ranking, ("correlation", "mutual_info"))
+        _check(self.max_candidates >= 1, "feature_engineering.feature_generation.max_candidates must be positive.")
+        _check(self.max_features >= 0, "feature_engineering.feature_generation.max_features must not be negative.")
+        _check(self.max_memory_mb is None or self.max_memory_mb > 0,
+               "feature_engineering.feature_generation.max_memory_mb must be positive.")
+        _check(self.block_size >= 1, "feature_engineering.feature_generation.block_size must be positive.")
+        _check(self.sample_rows >= 1, "feature_engineering.feature_generation.sample_rows must be positive.")
+
+@dataclass(frozen=True)
+class CorrelationPruningConfig:
+    strategy: str = "greedy"
+    block_size: int = 256
+    sample_rows: typing.Optional[int] = None
+    confidence: float = 0.95
+    random_state: int = 42
+
+    def __post_init__(self):
+        _check_choice("feature_engineering.correlation_pruning.strategy", self.strategy, ("greedy", "cluster"))
+        _check(self.block_size >= 1, "feature_engineering.correlation_pruning.block_size must be positive.")
+        _check(self.sample_rows is None or self.sample_rows > 3,
+               "feature_engineering.correlation_pruning.sample_rows must be greater than 3.")
+        _check(0 < self.confidence < 1, "feature_engineering.correlation_pruning.confidence must be between 0 and 1.")
+
+@dataclass(frozen=True)
+class FeatureEngineeringConfig:
+    correlation_threshold: float = 0.8
+    variance_threshold: float = 0.01
+    polynomial_degree: int = 2
+    log_transform_skew_threshold: float = 0.75
+    binning: BinningConfig = field(default_factory=BinningConfig)
+    encoding: EncodingConfig = field(default_factory=EncodingConfig)
+    interaction_features: InteractionFeaturesConfig = field(default_factory=InteractionFeaturesConfig)
+    feature_generation: FeatureGenerationConfig = field(default_factory=FeatureGenerationConfig)
+    correlation_pruning: CorrelationPruningConfig = field(default_factory=CorrelationPruningConfig)
+    feature_selection: FeatureSelectionConfig = field(default_factory=FeatureSelectionConfig)
+
+    def __post_init__(self):
+        _check(0 < self.correlation_threshold <= 1, "feature_engineering.correlation_threshold must be in (0, 1].")
+        _check(self.polynomial_degree >= 1, "feature_engineering.polynomial_degree must be at least 1.")
+
+@dataclass(frozen=True)
+class ModelConfig:
+    name: str = "RandomForestClassifier"
+    params: dict = field(default_factory=dict)
+
+@dataclass(frozen=True)
+class ModelsConfig:
+    classification: ModelConfig = field(default_factory=ModelConfig)
+    regression: ModelConfig = field(default_factory=lambda: ModelConfig(name="RandomForestRegressor"))
+
+@dataclass(frozen=True)
+class SearchConfig:
+    generations: typing.Optional[int] = 5
+    population_size: int = 20
+    time_budget_seconds: float = 600
+    max_eval_time_mins: float = 5
+    n_jobs: int = -1
+    checkpoint_every: int = 1
+    checkpoint_path: typing.Optional[str] = None
+    resume: bool = True
+    verbosity: int = 2
+
+    def __post_init__(self):
+        _check(self.generations is None or self.generations >= 1, "training.search.generations must be positive.")
+        _check(self.population_size >= 2, "training.search.population_size must be at least 2.")
+        _check(self.time_budget_seconds > 0, "training.search.time_budget_seconds must be positive.")
+        _check(self.max_eval_time_mins > 0, "training.search.max_eval_time_mins must be positive.")
+        _check(self.n_jobs != 0, "training.search.n_jobs must not be 0 (use -1 for all cores).")
+        _check(self.checkpoint_every >= 1, "training.search.checkpoint_every must be positive.")
+
+@dataclass(frozen=True)
+class TrainingConfig:
+    test_size: float = 0.2
+    random_state: int = 42
+    model: ModelsConfig = field(default_factory=ModelsConfig)
+    search: SearchConfig = field(default_factory=SearchConfig)
+    metric_threshold: typing.Optional[float] = None
+
+    def __post_init__(self):
+        _check(0 < self.test_size < 1, "training.test_size must be between 0 and 1.")
+
+@dataclass(frozen=True)
+class DataLoadingConfig:
+    optimize_dtypes: bool = False
+    sample_rows: int = 10000
+    cache_dir: typing.Optional[str] = None
+
+    def __post_init__(self):
+        _check(self.sample_rows >= 1, "data_loading.sample_rows must be positive.")
+
+@dataclass(frozen=True)
+class MissingValuesConfig:
+    drop_rows_max_percentage: float = 5
+    add_indicators: bool = False
+
+    def __post_init__(self):
+        _check(0 <= self.drop_rows_max_percentage <= 100, "missing_values.drop_rows_max_percentage must be in [0, 100].")
+
+@dataclass(frozen=True)
+class OutlierConfig:
+    method: str = "exact"
+    iqr_multiplier: float = 1.5
+    sample_rows: int = 1000000
+    random_state: int = 42
+
+    def __post_init__(self):
+        _check_choice("outliers.method", self.method, ("exact", "approximate"))
+        _check(self.iqr_multiplier > 0, "outliers.iqr_multiplier must be positive.")
+        _check(self.sample_rows >= 1, "outliers.sample_rows must be positive.")
+
+@dataclass(frozen=True)
+class ReportingConfig:
+    enabled: bool = False
+    sample_rows: int = 5000
+    max_heatmap_columns: int = 50
+    output_dir: typing.Optional[str] = None
+
+    def __post_init__(self):
+        _check(self.sample_rows >= 1, "reporting.sample_rows must be positive.")
+        _check(self.max_heatmap_columns >= 2, "reporting.max_heatmap_columns must be at least 2.")
+
+@dataclass(frozen=True)
+class StageCacheConfig:
+    enabled: bool = False
+    directory: str = ".automlforge_cache"
+    max_size_mb: float = 2048
+
+    def __post_init__(self):
+        _check(self.max_size_mb > 0, "stage_cache.max_size_mb must be positive.")
+
+@dataclass(frozen=True)
+class LowMemoryConfig:
+    enabled: bool = False
+    dtype: str = "float32"
+
+    def __post_init__(self):
+        _check_choice("low_memory.dtype", self.dtype, ("float32", "float64"))
+
+@dataclass(frozen=True)
+class ProfilingConfig:
+    enabled: bool = False
+    format: str = "json"
+    trace_memory: bool = False
+    output: typing.Optional[str] = None
+
+    def __post_init__(self):
+        _check_choice("profiling.format", self.format, ("json", "chrome"))
+
+@dataclass(frozen=True)
+class ServingConfig:
+    host: str = "127.0.0.1"
+    port: int = 8000
+    unix_socket: typing.Optional[str] = None
+    cache_size: int = 4
+    max_batch_rows: int = 1024
+    max_batch_delay_ms: float = 5
+    stats_window: int = 10000
+    models_dir: typing.Optional[str] = None
+
+    def __post_init__(self):
+        _check(self.cache_size >= 1, "serving.cache_size must be positive.")
+        _check(self.max_batch_rows >= 1, "serving.max_batch_rows must be positive.")
+        _check(self.max_batch_delay_ms >= 0, "serving.max_batch_delay_ms must not be negative.")
+        _check(self.stats_window >= 1, "serving.stats_window must be positive.")
+
+@dataclass(frozen=True)
+class AutoMLConfig:
+    """Immutable, validated view of config.yaml."""
+    feature_engineering: FeatureEngineeringConfig = field(default_factory=FeatureEngineeringConfig)
+    training: TrainingConfig = field(default_factory=TrainingConfig)
+    data_loading: DataLoadingConfig = field(default_factory=DataLoadingConfig)
+    missing_values: MissingValuesConfig = field(default_factory=MissingValuesConfig)
+    outliers: OutlierConfig = field(default_factory=OutlierConfig)
+    reporting: ReportingConfig = field(default_factory=ReportingConfig)
+    low_memory: LowMemoryConfig = field(default_factory=LowMemoryConfig)
+    profiling: ProfilingConfig = field(default_factory=ProfilingConfig)
+    serving: ServingConfig = field(default_factory=ServingConfig)
+    stage_cache: StageCacheConfig = field(default_factory=StageCacheConfig)
+
+def load_config(path=None):
+    """Loads and validates a config file, parsing each file at most once per modification."""
+    path = os.path.abspath(path or DEFAULT_CONFIG_PATH)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Config file not found: {path}")
+    return _load_config_cached(path, os.path.getmtime(path))
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(path, mtime):
+    with open(path, "r") as file:
+        raw = yaml.safe_load(file) or {}
+    return config_from_dict(raw)
+
+def config_from_dict(raw):
+    """Builds an AutoMLConfig from a parsed YAML mapping, filling in defaults."""
+    return _build(AutoMLConfig, raw, "")
+
+def _build(cls, raw, section):
+    if raw is None:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ValueError(f"Config section '{section or 'root'}' must be a mapping.")
+
+    hints = typing.get_type_hints(cls)
+    names = {f.name for f in dataclasses.fields(cls)}
+    unknown = set(raw) - names
+    if unknown:
+        raise ValueError(f"Unknown config keys in '{section or 'root'}': {sorted(unknown)}")
+
+    values = {}
+    for name, value in raw.items():
+        field_type = hints[name]
+        key = f"{section}.{name}" if section else name
+        if dataclasses.is_dataclass(field_type):
+            values[name] = _build(field_type, value, key)
+        else:
+            values[name] = _coerce(field_type, value, key)
+    return cls(**values)
+
+def _coerce(field_type, value, key):
+    if typing.get_origin(field_type) is typing.Union:
+        if value is None:
+            return None
+        field_type = next(arg for arg in typing.get_args(field_type) if arg is not type(None))
+    if field_type is bool:
+        if not isinstance(value, bool):
+            raise ValueError(f"Config key '{key}' must be a boolean.")
+        return value
+    if field_type in (int, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Config key '{key}' must be a number.")
+        if field_type is int and value != int(value):
+            raise ValueError(f"Config key '{key}' must be an integer.")
+        return field_type(value)
+    if field_type is str:
+        if not isinstance(value, str):
+            raise ValueError(f"Config key '{key}' must be a string.")
+        return value
+    if field_type is dict:
+        if not isinstance(value, dict):
+            raise ValueError(f"Config key '{key}' must be a mapping.")
+        return dict(value)
+    # Sequences such as interaction pairs are normalised by the dataclass itself.
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"Config key '{key}' must be a list.")
+    return value
+
+def _check(condition, message):
+    if not condition:
+        raise ValueError(message)
+
+def _check_choice(key, value, choices):
+    _check(value in choices, f"Config key '{key}' must be one of {choices}, got '{value}'.")
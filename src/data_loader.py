@@ -0,0 +1,221 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+import pandas.api.types as ptypes
+from data_validator import (validate_file_path, iter_csv_chunks, read_csv_header, check_csv_field_counts,
+                            validate_columnar_file, numpy_column_names, import_pyarrow, PARQUET_EXTENSIONS,
+                            FEATHER_EXTENSIONS, NUMPY_EXTENSIONS)
+from profiling import profile_stage
+
+# Default number of rows sampled when inferring a compact schema.
+DEFAULT_SAMPLE_ROWS = 10000
+# Object columns whose sampled unique ratio is at or below this become categoricals.
+DEFAULT_CATEGORY_RATIO = 0.5
+
+# Readers by file extension: reader(file_path, logger, columns=None, **options) -> DataFrame.
+READERS = {}
+# Chunked readers by file extension: reader(file_path, logger, chunksize, columns=None, **options) -> iterator.
+CHUNK_READERS = {}
+
+def infer_schema(file_path, logger, sample_rows=DEFAULT_SAMPLE_ROWS, category_ratio=DEFAULT_CATEGORY_RATIO):
+    """Infers compact read dtypes for a CSV file from a sample of its rows."""
+    sample = pd.read_csv(file_path, nrows=sample_rows)
+    schema = {}
+    for col in sample.columns:
+        series = sample[col]
+        if ptypes.is_bool_dtype(series):
+            continue
+        if ptypes.is_integer_dtype(series):
+            # Rows outside the sample may be missing, so read integers as nullable.
+            schema[col] = "Int64"
+        elif ptypes.is_float_dtype(series):
+            schema[col] = "float32"
+        elif ptypes.is_object_dtype(series) or ptypes.is_string_dtype(series):
+            non_null = series.dropna()
+            if len(non_null) and non_null.nunique() / len(non_null) <= category_ratio:
+                schema[col] = "category"
+    logger.debug(f"Inferred schema from {len(sample)} sampled rows: {schema}")
+    return schema
+
+def downcast_integers(data, logger):
+    """Downcasts integer columns to the smallest dtype that holds their full range."""
+    for col in data.select_dtypes(include=["integer"]).columns:
+        series = data[col]
+        if series.isna().any():
+            # Keep the nullable extension type, only narrowing its width.
+            low, high = series.min(), series.max()
+            if pd.isna(low):
+                continue
+            for nullable in ("Int8", "Int16", "Int32"):
+                info = np.iinfo(nullable.lower())
+                if info.min <= low and high <= info.max:
+                    data[col] = series.astype(nullable)
+                    break
+        else:
+            data[col] = pd.to_numeric(series.to_numpy(dtype=np.int64), downcast="integer")
+    logger.debug("Integer columns downcast to their smallest dtype.")
+    return data
+
+def register_reader(extensions, reader, chunk_reader=None):
+    """Registers the reader (and optionally the chunked reader) used for the given file extensions."""
+    for extension in extensions:
+        READERS[extension.lower()] = reader
+        if chunk_reader is not None:
+            CHUNK_READERS[extension.lower()] = chunk_reader
+
+def supported_extensions():
+    return tuple(READERS)
+
+def load_data(file_path, logger, optimize_dtypes=False, sample_rows=DEFAULT_SAMPLE_ROWS,
+              category_ratio=DEFAULT_CATEGORY_RATIO, columns=None, cache_dir=None):
+    """Validates and loads an input file with the reader registered for its extension.
+
+    `columns` projects the read to a subset of columns. With `cache_dir`, a CSV file is
+    parsed once and stored as Parquet under a key derived from its content hash and the
+    dtype options; later runs on the same content read the cached file instead.
+    """
+    with profile_stage("validate"):
+        validate_file_path(file_path, logger, supported_extensions())
+    extension = os.path.splitext(file_path)[1].lower()
+    options = {"optimize_dtypes": optimize_dtypes, "sample_rows": sample_rows, "category_ratio": category_ratio}
+
+    with profile_stage("read") as record:
+        if extension == ".csv" and cache_dir:
+            data = _load_cached_csv(file_path, logger, cache_dir, columns, options)
+        else:
+            data = READERS[extension](file_path, logger, columns=columns, **options)
+        record.output(data)
+
+    if data.columns.empty:
+        raise ValueError(f"File has no columns: {file_path}")
+    logger.debug(f"Loaded {data.shape[0]} rows and {data.shape[1]} columns "
+                 f"({data.memory_usage(deep=True).sum() / 1024 ** 2:.2f} MB).")
+    return data
+
+def iter_data_chunks(file_path, logger, chunksize, optimize_dtypes=False, sample_rows=DEFAULT_SAMPLE_ROWS,
+                     category_ratio=DEFAULT_CATEGORY_RATIO, columns=None):
+    """Streams an input file in chunks of at most `chunksize` rows, whatever its format."""
+    validate_file_path(file_path, logger, tuple(CHUNK_READERS))
+    extension = os.path.splitext(file_path)[1].lower()
+    yield from CHUNK_READERS[extension](file_path, logger, chunksize, columns=columns, optimize_dtypes=optimize_dtypes,
+                                        sample_rows=sample_rows, category_ratio=category_ratio)
+
+def file_hash(file_path):
+    """Returns the SHA-256 of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_csv(file_path, logger, columns=None, optimize_dtypes=False, sample_rows=DEFAULT_SAMPLE_ROWS,
+             category_ratio=DEFAULT_CATEGORY_RATIO):
+    """Reads a CSV file in a single parse, optionally with a compact sampled schema."""
+    # Pandas would silently rename duplicate and invent empty column names.
+    header = read_csv_header(file_path)
+    dtype = infer_schema(file_path, logger, sample_rows, category_ratio) if optimize_dtypes else None
+    try:
+        data = pd.read_csv(file_path, dtype=dtype, usecols=columns)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        raise ValueError(f"Error reading CSV file: {e}")
+    except (TypeError, ValueError) as e:
+        if dtype is None:
+            raise
+        # The sampled schema did not hold for the whole file; fall back to default parsing.
+        logger.warning(f"Sampled schema did not fit the full file ({e}); reading with default dtypes.")
+        data = pd.read_csv(file_path, usecols=columns)
+    # Pandas pads short rows with NaN; the same rows are rejected as by `validate_csv_file`.
+    check_csv_field_counts(file_path, len(data), len(header))
+
+    if optimize_dtypes:
+        data = downcast_integers(data, logger)
+    return data
+
+def read_parquet(file_path, logger, columns=None, **options):
+    """Reads a Parquet file, memory-mapped and projected to `columns`."""
+    validate_columnar_file(file_path, logger, columns or ())
+    import_pyarrow(file_path)
+    import pyarrow.parquet
+    return pyarrow.parquet.read_table(file_path, columns=columns, memory_map=True).to_pandas()
+
+def read_feather(file_path, logger, columns=None, **options):
+    """Reads a Feather / Arrow IPC file, memory-mapped and projected to `columns`."""
+    validate_columnar_file(file_path, logger, columns or ())
+    import_pyarrow(file_path)
+    import pyarrow.feather
+    return pyarrow.feather.read_table(file_path, columns=columns, memory_map=True).to_pandas()
+
+def read_numpy(file_path, logger, columns=None, **options):
+    """Memory-maps a 2-D `.npy` feature matrix as a DataFrame.
+
+    The map is copy-on-write: pages are only read when used and in-place edits never
+    reach the file. Projecting to `columns` copies just the selected columns.
+    """
+    validate_columnar_file(file_path, logger, columns or ())
+    matrix = np.load(file_path, mmap_mode="c")
+    names = numpy_column_names(file_path, matrix.shape[1])
+    if columns is not None:
+        matrix = matrix[:, [names.index(col) for col in columns]]
+        names = list(columns)
+    return pd.DataFrame(matrix, columns=names, copy=False)
+
+def _iter_csv(file_path, logger, chunksize, columns=None, optimize_dtypes=False, sample_rows=DEFAULT_SAMPLE_ROWS,
+              category_ratio=DEFAULT_CATEGORY_RATIO):
+    dtype = infer_schema(file_path, logger, sample_rows, category_ratio) if optimize_dtypes else None
+    yield from iter_csv_chunks(file_path, logger, chunksize, dtype=dtype, usecols=columns)
+
+def _iter_parquet(file_path, logger, chunksize, columns=None, **options):
+    validate_columnar_file(file_path, logger, columns or ())
+    import_pyarrow(file_path)
+    import pyarrow.parquet
+    parquet_file = pyarrow.parquet.ParquetFile(file_path, memory_map=True)
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+def _iter_feather(file_path, logger, chunksize, columns=None, **options):
+    validate_columnar_file(file_path, logger, columns or ())
+    pyarrow = import_pyarrow(file_path)
+    import pyarrow.ipc
+    with pyarrow.memory_map(file_path) as source:
+        reader = pyarrow.ipc.open_file(source)
+        # Record batches are decompressed one at a time, so only one is held in memory.
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, chunksize):
+                yield batch.slice(start, chunksize).to_pandas()
+
+def _iter_numpy(file_path, logger, chunksize, columns=None, **options):
+    data = read_numpy(file_path, logger, columns)
+    for start in range(0, len(data), chunksize):
+        # Copy each slice so only the current chunk's pages stay resident.
+        yield data.iloc[start:start + chunksize].copy()
+
+def _load_cached_csv(file_path, logger, cache_dir, columns, options):
+    """Reads a CSV through its content-addressed Parquet copy, creating the copy on a miss."""
+    key = hashlib.sha256(f"{file_hash(file_path)}:{sorted(options.items())}".encode()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    cache_path = os.path.join(cache_dir, f"{stem}-{key}.parquet")
+    if os.path.exists(cache_path):
+        logger.info(f"Reading cached columnar copy of {file_path}: {cache_path}")
+        return read_parquet(cache_path, logger, columns)
+
+    # The cached copy always holds every column so any later projection can reuse it.
+    data = read_csv(file_path, logger, **options)
+    try:
+        import_pyarrow(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.tmp"
+        data.to_parquet(temp_path, index=False)
+        os.replace(temp_path, cache_path)
+        logger.info(f"Cached columnar copy of {file_path} at: {cache_path}")
+    except Exception as e:
+        logger.warning(f"Could not cache {file_path} as Parquet: {e}")
+    return data[columns] if columns is not None else data
+
+register_reader((".csv",), read_csv, _iter_csv)
+register_reader(PARQUET_EXTENSIONS, read_parquet, _iter_parquet)
+register_reader(FEATHER_EXTENSIONS, read_feather, _iter_feather)
+register_reader(NUMPY_EXTENSIONS, read_numpy, _iter_numpy)
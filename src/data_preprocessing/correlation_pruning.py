@@ -0,0 +1,113 @@
+import math
+from statistics import NormalDist
+import pandas as pd
+import numpy as np
+import pandas.api.types as ptypes
+
+def fit_correlation_pruning(data, target, threshold, pruning_config, logger):
+    """Returns the numerical columns to drop because they are highly correlated with a kept column.
+
+    Correlations are computed in float32 column blocks, so the full p x p matrix is never
+    held in memory. With `sample_rows` set, they are estimated from a row sample and a pair
+    only counts as correlated when the lower confidence bound of |r| exceeds the threshold.
+    The target is never a pruning candidate; when given, it decides which column of a
+    correlated group is kept.
+    """
+    numeric = data.select_dtypes(include=np.number)
+    if target is not None and target.name in numeric.columns:
+        numeric = numeric.drop(columns=[target.name])
+    columns = list(numeric.columns)
+    if len(columns) < 2:
+        return []
+
+    if pruning_config.sample_rows is not None and len(numeric) > pruning_config.sample_rows:
+        numeric = numeric.sample(n=pruning_config.sample_rows, random_state=pruning_config.random_state)
+        threshold = _sample_threshold(threshold, len(numeric), pruning_config.confidence)
+        logger.debug(f"Correlations estimated from {len(numeric)} sampled rows; "
+                     f"effective threshold {threshold:.4f} at {pruning_config.confidence:.0%} confidence.")
+
+    standardized = _standardize(numeric.to_numpy(dtype=np.float32))
+    pairs = correlated_pairs(standardized, threshold, pruning_config.block_size)
+    logger.debug(f"Found {len(pairs)} column pairs with |r| > {threshold:.4f}.")
+    if not pairs:
+        return []
+
+    # Columns most related to the target are kept first; otherwise the original order wins.
+    priority = list(range(len(columns)))
+    if target is not None:
+        codes = target.loc[numeric.index]
+        codes = codes.to_numpy(dtype=np.float32) if ptypes.is_numeric_dtype(codes) else pd.factorize(codes)[0]
+        target_corr = np.abs(_standardize(codes.astype(np.float32).reshape(-1, 1))[:, 0] @ standardized) / len(numeric)
+        priority.sort(key=lambda i: -target_corr[i])
+
+    if pruning_config.strategy == "cluster":
+        dropped = _prune_clusters(pairs, priority)
+    else:
+        dropped = _prune_greedy(pairs, priority)
+    return [columns[i] for i in sorted(dropped)]
+
+def correlated_pairs(standardized, threshold, block_size):
+    """Returns (i, j) index pairs with i < j whose absolute correlation exceeds the threshold."""
+    n_rows, n_cols = standardized.shape
+    pairs = []
+    for start in range(0, n_cols, block_size):
+        stop = min(start + block_size, n_cols)
+        # One BLAS call per block: correlations of this block against every later column.
+        block = np.abs(standardized[:, start:stop].T @ standardized[:, start:]) / n_rows
+        rows, cols = np.nonzero(np.triu(block > threshold, k=1))
+        pairs.extend(zip((rows + start).tolist(), (cols + start).tolist()))
+    return pairs
+
+def _standardize(values):
+    """Centres and scales columns to unit variance in float32; constant columns become zeros."""
+    mean = np.nanmean(values, axis=0)
+    values = np.nan_to_num(values - mean)
+    std = values.std(axis=0)
+    std[std == 0] = 1
+    values /= std
+    return values
+
+def _sample_threshold(threshold, n_rows, confidence):
+    """Raises the threshold so that |r| above it has its lower confidence bound above `threshold`."""
+    if threshold >= 1 or n_rows <= 3:
+        return threshold
+    z_crit = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return math.tanh(math.atanh(threshold) + z_crit / math.sqrt(n_rows - 3))
+
+def _prune_greedy(pairs, priority):
+    """Keeps columns in priority order unless they correlate with an already kept column."""
+    neighbours = {}
+    for i, j in pairs:
+        neighbours.setdefault(i, set()).add(j)
+        neighbours.setdefault(j, set()).add(i)
+    kept, dropped = set(), set()
+    for i in priority:
+        if neighbours.get(i, set()) & kept:
+            dropped.add(i)
+        else:
+            kept.add(i)
+    return dropped
+
+def _prune_clusters(pairs, priority):
+    """Groups transitively correlated columns (union-find) and keeps one column per group."""
+    parent = {}
+
+    def find(i):
+        parent.setdefault(i, i)
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[root_j] = root_i
+
+    rank = {i: position for position, i in enumerate(priority)}
+    representative = {}
+    for i in parent:
+        root = find(i)
+        if root not in representative or rank[i] < rank[representative[root]]:
+            representative[root] = i
+    return set(parent) - set(representative.values())
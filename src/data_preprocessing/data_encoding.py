@@ -1,32 +1,142 @@
 import pandas as pd
+import numpy as np
 import logging
-import yaml
-from sklearn.preprocessing import OneHotEncoder, LabelEncoder
+from config_loader import load_config
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, TargetEncoder
 
-def encode_categorical_data(data, logger):
+def encode_categorical_data(data, logger, config=None, target=None):
     """Encodes categorical data using config parameters."""
-    with open("config/config.yaml", "r") as file:
-        config = yaml.safe_load(file)
-
-    encoding_config = config["feature_engineering"]["encoding"]
-    categorical_threshold = encoding_config["categorical_threshold"]
-    default_encoding = encoding_config["default_encoding"]
-
-    categorical_cols = data.select_dtypes(include=['object']).columns
-
-    for col in categorical_cols:
-        if data[col].nunique() <= categorical_threshold:
-            if default_encoding == "onehot":
-                logger.debug(f"One-hot encoding column: {col}")
-                encoder = OneHotEncoder(sparse_output=False, drop='first')
-                encoded_cols = encoder.fit_transform(data[[col]])
-                encoded_df = pd.DataFrame(encoded_cols, columns=encoder.get_feature_names_out([col]))
-                data = pd.concat([data.drop(col, axis=1), encoded_df], axis=1)
-            elif default_encoding == "label":
-                logger.debug(f"Label encoding column: {col}")
-                encoder = LabelEncoder()
-                data[col] = encoder.fit_transform(data[col])
+    config = config or load_config()
+    encoding_config = config.feature_engineering.encoding
+    _, data = fit_transform_categorical_encoders(data, target, encoding_config, logger)
+    return data
+
+def fit_transform_categorical_encoders(data, target, encoding_config, logger):
+    """Fits the categorical encoders and returns them with the encoded training frame.
+
+    Columns with at most `categorical_threshold` distinct values are encoded together
+    with `default_encoding`; the rest use `high_cardinality_encoding`. Target encoding
+    is fitted with cross-fitting, so the training frame gets out-of-fold encodings
+    while the stored encoder (fitted on all rows) is used at inference.
+    """
+    categorical_cols = list(data.select_dtypes(include=['object', 'category']).columns)
+    nunique = data[categorical_cols].nunique()
+    low_cardinality = [col for col in categorical_cols if nunique[col] <= encoding_config.categorical_threshold]
+    high_cardinality = [col for col in categorical_cols if nunique[col] > encoding_config.categorical_threshold]
+
+    low_encoding = encoding_config.default_encoding
+    high_encoding = encoding_config.high_cardinality_encoding
+    if target is None:
+        if low_encoding == "target":
+            logger.warning("Target encoding requested without a target; falling back to one-hot encoding.")
+            low_encoding = "onehot"
+        if high_encoding == "target":
+            logger.warning("Target encoding requested without a target; falling back to hashing.")
+            high_encoding = "hashing"
+
+    encoders = {"steps": [], "sparse_output": encoding_config.sparse_output}
+    blocks = []
+    for encoding, columns in ((low_encoding, low_cardinality), (high_encoding, high_cardinality)):
+        if not columns:
+            continue
+        logger.debug(f"Fitting {encoding} encoding for columns: {columns}")
+        encoder = _make_encoder(encoding, encoding_config)
+        if encoding == "target":
+            # fit_transform cross-fits: each training row is encoded by a model that never saw it.
+            values = encoder.fit_transform(data[columns], target)
+        elif encoding == "hashing":
+            values = None
         else:
-            logger.debug(f"Skipping encoding for column: {col} due to high cardinality.")
+            encoder.fit(data[columns])
+            values = None
+        step = (encoding, columns, encoder)
+        encoders["steps"].append(step)
+        blocks.append(_encode_block(data, step, encoding_config.sparse_output, values))
 
-    return data
+    encoders["memory_report"] = _memory_report(data, encoders["steps"], blocks)
+    for col, usage in encoders["memory_report"].items():
+        logger.debug(f"Encoded '{col}' with {usage['encoding']}: {usage['input_bytes']} -> "
+                     f"{usage['output_bytes']} bytes in {usage['output_columns']} columns.")
+
+    return encoders, _assemble(data, encoders["steps"], blocks)
+
+def apply_categorical_encoders(data, encoders, logger):
+    """Encodes categorical columns with previously fitted encoders."""
+    steps = encoders["steps"]
+    blocks = [_encode_block(data, step, encoders["sparse_output"]) for step in steps]
+    logger.debug(f"Encoded {sum(len(columns) for _, columns, _ in steps)} categorical columns.")
+    return _assemble(data, steps, blocks)
+
+def _make_encoder(encoding, encoding_config):
+    if encoding == "onehot":
+        return OneHotEncoder(drop='first', handle_unknown='ignore', sparse_output=True, dtype=np.uint8)
+    if encoding == "label":
+        # Unseen categories are mapped to -1 at inference time.
+        return OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1, dtype=np.float32)
+    if encoding == "target":
+        return TargetEncoder(cv=encoding_config.target_encoding_folds, shuffle=True,
+                             random_state=encoding_config.random_state)
+    if encoding == "hashing":
+        return FeatureHasher(n_features=encoding_config.hashing_n_features, input_type="string", alternate_sign=False)
+    raise ValueError(f"Unknown encoding: {encoding}")
+
+def _encode_block(data, step, sparse_output, values=None):
+    """Encodes all columns of one step into a single DataFrame block."""
+    encoding, columns, encoder = step
+    if encoding == "onehot":
+        matrix = encoder.transform(data[columns])
+        names = encoder.get_feature_names_out(columns)
+        if sparse_output:
+            return pd.DataFrame.sparse.from_spmatrix(matrix, index=data.index, columns=names)
+        return pd.DataFrame(matrix.toarray(), index=data.index, columns=names)
+    if encoding == "label":
+        codes = encoder.transform(data[columns]).astype(np.int32)
+        return pd.DataFrame(codes, index=data.index, columns=columns)
+    if encoding == "target":
+        if values is None:
+            values = encoder.transform(data[columns])
+        return pd.DataFrame(values.astype(np.float32), index=data.index, columns=encoder.get_feature_names_out(columns))
+    # Hashing is stateless: each column gets its own block of hashed indicator features.
+    hashed = []
+    for col in columns:
+        matrix = encoder.transform(data[col].astype(str).to_numpy().reshape(-1, 1)).astype(np.uint8)
+        names = [f"{col}_hash_{i}" for i in range(encoder.n_features)]
+        if sparse_output:
+            hashed.append(pd.DataFrame.sparse.from_spmatrix(matrix, index=data.index, columns=names))
+        else:
+            hashed.append(pd.DataFrame(matrix.toarray(), index=data.index, columns=names))
+    return pd.concat(hashed, axis=1)
+
+def _assemble(data, steps, blocks):
+    """Replaces the encoded columns with their blocks in a single concat."""
+    encoded_cols = [col for _, columns, _ in steps for col in columns]
+    if not encoded_cols:
+        return data
+    return pd.concat([data.drop(columns=encoded_cols)] + blocks, axis=1)
+
+def _output_widths(step):
+    """Returns how many output columns each input column of a step produces, in block order."""
+    encoding, columns, encoder = step
+    if encoding == "onehot":
+        return [len(categories) - (drop is not None)
+                for categories, drop in zip(encoder.categories_, encoder.drop_idx_)]
+    if encoding == "target":
+        return [len(encoder.classes_) if encoder.target_type_ == "multiclass" else 1] * len(columns)
+    if encoding == "hashing":
+        return [encoder.n_features] * len(columns)
+    return [1] * len(columns)
+
+def _memory_report(data, steps, blocks):
+    """Reports input and encoded memory usage per categorical column."""
+    report = {}
+    for step, block in zip(steps, blocks):
+        output_bytes = block.memory_usage(deep=True, index=False).to_numpy()
+        start = 0
+        for col, width in zip(step[1], _output_widths(step)):
+            report[col] = {"encoding": step[0],
+                           "input_bytes": int(data[col].memory_usage(deep=True, index=False)),
+                           "output_bytes": int(output_bytes[start:start + width].sum()),
+                           "output_columns": width}
+            start += width
+    return report
@@ -1,16 +1,26 @@
 import pandas as pd
+import pandas.api.types as ptypes
 import logging
-from .handle_missing import handle_missing_data
-from .handle_outliers import handle_outliers
-from .handle_skew import reduce_skewness
-from .feature_engineering import feature_engineering_and_correlation
-from .data_encoding import encode_categorical_data
+from .handle_missing_data import drop_sparse_missing_rows, fit_missing_values, apply_missing_values
+from .handle_outliers import fit_outlier_bounds, apply_outlier_bounds
+from .handle_skew import fit_skewed_columns, apply_skew_transform
+from .feature_engineering import fit_feature_engineering, apply_feature_engineering
+from .data_encoding import fit_transform_categorical_encoders, apply_categorical_encoders
+from .numeric_block import NumericBlock, BLOCK_STAGES
+from .stage_cache import StageCache
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import StandardScaler
-import yaml
+from sklearn.utils.validation import check_is_fitted
+from config_loader import load_config
+from profiling import profile_stage
 import numpy as np
 
-def preprocess_data(data, target_column, logger):
-    """Preprocesses the input DataFrame."""
+def preprocess_data(data, target_column, logger, config=None):
+    """Preprocesses the input DataFrame.
+
+    Fits a DataPreprocessor on `data` and returns the transformed frame, with the
+    target column re-attached when one is given.
+    """
     logger.debug("Starting data preprocessing.")
 
     if target_column:
@@ -18,41 +28,233 @@ def preprocess_data(data, target_column, logger):
             raise KeyError(f"Target column '{target_column}' not found in the DataFrame.")
         logger.debug(f"Target column: {target_column}")
 
-    logger.debug("Handling missing data...")
-    data = handle_missing_data(data, logger)
+    config = config or load_config()
+    data = drop_sparse_missing_rows(data, logger, config.missing_values.drop_rows_max_percentage)
+    preprocessor = DataPreprocessor(target_column=target_column, config=config)
+    transformed = preprocessor.fit_transform(data)
+    if target_column:
+        transformed[target_column] = data[target_column]
 
-    logger.debug("Handling outliers...")
-    data = handle_outliers(data, logger)
+    logger.debug("Data preprocessing completed.")
+    return transformed
 
-    # Load config file
-    with open("config/config.yaml", "r") as file:
-        config = yaml.safe_load(file)
-    fe_config = config["feature_engineering"]
+class DataPreprocessor(BaseEstimator, TransformerMixin):
+    """Learns every preprocessing statistic once during training and replays it at inference.
 
-    # Only execute if needed.
-    if fe_config["polynomial_degree"] > 1 or fe_config["interaction_features"]["enabled"] or fe_config["feature_selection"]["enabled"] or data.select_dtypes(include=['object']).columns.any():
-        logger.debug("Reducing skewness...")
-        for col in data.select_dtypes(include=np.number).columns:
-            if col != target_column:
-                logger.debug(f"Reducing skewness in column: {col}")
-                data = reduce_skewness(data, col, logger)
+    Fitting learns the missing-value fills (and optional indicators), outlier bounds, skewed columns, categorical
+    encoders, feature engineering steps and scaler. `transform` only applies them, never
+    drops rows and always returns the training feature columns in the same order. The
+    target column is dropped from the input when present.
 
-        logger.debug("Encoding categorical data...")
-        data = encode_categorical_data(data, logger)
+    With `low_memory.enabled`, the numerical columns are copied once into a NumericBlock
+    of `low_memory.dtype` and the numerical stages update it in place; it is turned back
+    into a frame for encoding and feature engineering, or at the end when those are off.
+    """
 
-        logger.debug("Performing feature engineering and correlation analysis...")
-        data = feature_engineering_and_correlation(data, logger)
+    def __init__(self, target_column=None, config=None):
+        self.target_column = target_column
+        self.config = config
 
-    logger.debug("Scaling numerical data...")
-    data = scale_numerical_data(data, logger)
+    def fit(self, X, y=None):
+        self.fit_transform(X, y)
+        return self
 
-    logger.debug("Data preprocessing completed.")
+    def fit_transform(self, X, y=None):
+        logger = logging.getLogger(__name__)
+        config = self.config or load_config()
+        fe_config = config.feature_engineering
+
+        if self.target_column and self.target_column in X.columns:
+            if y is None:
+                y = X[self.target_column]
+            X = X.drop(self.target_column, axis=1)
+        # Inference input is cast back to these, see `_cast_to_fit_dtypes`.
+        self.feature_dtypes_in_ = X.dtypes.to_dict()
+        # The block conversion copies the numerical columns, so the input is not copied first.
+        self.block_dtype_ = config.low_memory.dtype if config.low_memory.enabled else None
+        data = X if self.block_dtype_ else X.copy()
+        # Only execute if needed. Missing values and outliers never add categorical columns.
+        self.feature_stages_enabled_ = bool(
+            fe_config.polynomial_degree > 1
+            or fe_config.interaction_features.enabled
+            or fe_config.feature_selection.enabled
+            or len(data.select_dtypes(include=['object', 'category']).columns) > 0)
+
+        # Unchanged stages are loaded from the stage cache when it is enabled.
+        cache = StageCache(config.stage_cache, logger)
+        cache.start(data, y)
+
+        if self.block_dtype_:
+            _, data = _run_stage(cache, data, "numeric_block", config.low_memory,
+                                 lambda: (None, NumericBlock.from_frame(data, self.block_dtype_)))
+            # Inference builds its block from these columns, whatever dtypes they arrive with.
+            self.block_columns_ = list(data.columns)
+
+        logger.debug("Handling missing data...")
+        self.missing_values_, data = _run_stage(
+            cache, data, "missing_values", config.missing_values,
+            lambda: _fit_apply(data, logger, *_stage_functions("missing_values", data), config.missing_values))
+
+        logger.debug("Handling outliers...")
+        self.outlier_bounds_, data = _run_stage(
+            cache, data, "outliers", config.outliers,
+            lambda: _fit_apply(data, logger, *_stage_functions("outliers", data), config.outliers))
+
+        if self.feature_stages_enabled_:
+            logger.debug("Reducing skewness...")
+            self.skewed_columns_, data = _run_stage(
+                cache, data, "skew", fe_config.log_transform_skew_threshold,
+                lambda: _fit_apply(data, logger, *_stage_functions("skew", data),
+                                   fe_config.log_transform_skew_threshold))
+            data = _to_frame(data, "fit")
+
+            logger.debug("Encoding categorical data...")
+            self.encoders_, data = _run_stage(
+                cache, data, "encoding", fe_config.encoding,
+                lambda: fit_transform_categorical_encoders(data, y, fe_config.encoding, logger))
+
+            logger.debug("Performing feature engineering and correlation analysis...")
+            self.feature_engineering_, data = _run_stage(
+                cache, data, "feature_engineering", fe_config,
+                lambda: _fit_apply_with_target(data, y, logger, fit_feature_engineering, apply_feature_engineering,
+                                               fe_config))
+
+        logger.debug("Scaling numerical data...")
+        self.scaler_, data = _run_stage(
+            cache, data, "scaling", None,
+            lambda: _fit_apply(data, logger, *_stage_functions("scaling", data)))
+        data = _to_frame(data, "fit")
+
+        if cache.enabled:
+            logger.info(f"Stage cache saved {cache.time_saved:.2f}s in total.")
+        self.feature_names_out_ = list(data.columns)
+        return data
+
+    def transform(self, X):
+        check_is_fitted(self, "feature_names_out_")
+        logger = logging.getLogger(__name__)
+
+        if self.target_column:
+            data = X.drop(columns=[self.target_column], errors="ignore")
+        else:
+            data = X if self.block_dtype_ else X.copy()
+        data = _cast_to_fit_dtypes(data, self.feature_dtypes_in_, logger)
+        if self.block_dtype_:
+            with profile_stage("transform/numeric_block", data) as record:
+                data = NumericBlock.from_frame(data, self.block_dtype_, self.block_columns_)
+                record.output(data)
+
+        data = _apply_stage("missing_values", _stage_functions("missing_values", data)[1], data,
+                            self.missing_values_, logger)
+        data = _apply_stage("outliers", _stage_functions("outliers", data)[1], data, self.outlier_bounds_, logger)
+        if self.feature_stages_enabled_:
+            data = _apply_stage("skew", _stage_functions("skew", data)[1], data, self.skewed_columns_, logger)
+            data = _to_frame(data, "transform")
+            data = _apply_stage("encoding", apply_categorical_encoders, data, self.encoders_, logger)
+            data = _apply_stage("feature_engineering", apply_feature_engineering, data, self.feature_engineering_, logger)
+        data = _apply_stage("scaling", _stage_functions("scaling", data)[1], data, self.scaler_, logger)
+        data = _to_frame(data, "transform")
+
+        missing = [col for col in self.feature_names_out_ if col not in data.columns]
+        if missing:
+            logger.warning(f"Columns missing at transform time were filled with 0: {missing}")
+        return data.reindex(columns=self.feature_names_out_, fill_value=0)
+
+    def get_feature_names_out(self, input_features=None):
+        check_is_fitted(self, "feature_names_out_")
+        return np.asarray(self.feature_names_out_, dtype=object)
+
+def _run_stage(cache, data, stage, settings, compute):
+    """Fits one stage through the stage cache, recording it when profiling is enabled."""
+    with profile_stage(f"fit/{stage}", data) as record:
+        state, data = cache.run(stage, settings, compute)
+        record.output(data)
+    return state, data
+
+def _apply_stage(stage, apply, data, state, logger):
+    with profile_stage(f"transform/{stage}", data) as record:
+        data = apply(data, state, logger)
+        record.output(data)
+    return data
+
+def _cast_to_fit_dtypes(data, dtypes, logger):
+    """Casts columns back to their kind during fitting when they arrive with another dtype.
+
+    Records from JSON or single rows with nulls give object columns (all None) that the
+    numerical stages cannot process; unparseable values become NaN and are imputed.
+    Categorical columns that arrive empty are read as float64 and are cast back to object.
+    """
+    mismatched = [col for col, dtype in dtypes.items()
+                  if col in data.columns and data[col].dtype != dtype and not ptypes.is_bool_dtype(dtype)
+                  and (ptypes.is_numeric_dtype(dtype) or ptypes.is_numeric_dtype(data[col].dtype))]
+    if not mismatched:
+        return data
+    # A shallow copy keeps the caller's frame unchanged when columns are replaced.
+    data = data.copy(deep=False)
+    for col in mismatched:
+        if not ptypes.is_numeric_dtype(dtypes[col]):
+            data[col] = data[col].astype(object)
+            continue
+        values = pd.to_numeric(data[col], errors="coerce")
+        try:
+            data[col] = values.astype(dtypes[col])
+        except (TypeError, ValueError):
+            # Integer columns with missing values stay float.
+            data[col] = values.astype("float64")
+    logger.debug(f"Cast {len(mismatched)} columns back to their training dtypes: {mismatched}")
     return data
 
+def _stage_functions(stage, data):
+    """Returns the (fit, apply) functions of a numerical stage for a DataFrame or a NumericBlock."""
+    if isinstance(data, NumericBlock):
+        return BLOCK_STAGES[stage]
+    return {"missing_values": (fit_missing_values, apply_missing_values),
+            "outliers": (fit_outlier_bounds, apply_outlier_bounds),
+            "skew": (fit_skewed_columns, apply_skew_transform),
+            "scaling": (fit_scaler, apply_scaler)}[stage]
+
+def _to_frame(data, phase):
+    """Turns a NumericBlock back into a DataFrame; frames are returned unchanged."""
+    if not isinstance(data, NumericBlock):
+        return data
+    with profile_stage(f"{phase}/to_frame", data) as record:
+        data = data.to_frame()
+        record.output(data)
+    return data
+
+def _fit_apply(data, logger, fit, apply, *settings):
+    """Runs a stage's fit then apply and returns (state, transformed data)."""
+    state = fit(data, logger, *settings)
+    return state, apply(data, state, logger)
+
+def _fit_apply_with_target(data, target, logger, fit, apply, *settings):
+    state = fit(data, target, *settings, logger)
+    return state, apply(data, state, logger)
+
 def scale_numerical_data(data, logger):
     """Scales numerical data using StandardScaler."""
-    numerical_cols = data.select_dtypes(include=np.number).columns
+    scaler = fit_scaler(data, logger)
+    return apply_scaler(data, scaler, logger)
+
+def fit_scaler(data, logger):
+    """Fits a StandardScaler on the dense numerical columns."""
+    # Sparse indicator columns are left unscaled so they stay sparse.
+    numerical_cols = [col for col in data.select_dtypes(include=np.number).columns
+                      if not isinstance(data[col].dtype, pd.SparseDtype)]
     scaler = StandardScaler()
-    data[numerical_cols] = scaler.fit_transform(data[numerical_cols])
+    if numerical_cols:
+        scaler.fit(data[numerical_cols])
+    return numerical_cols, scaler
+
+def apply_scaler(data, fitted_scaler, logger):
+    """Scales numerical data with a fitted StandardScaler."""
+    numerical_cols, scaler = fitted_scaler
+    present = [col for col in numerical_cols if col in data.columns]
+    if present and len(present) < len(numerical_cols):
+        # Columns missing at inference are left to the final reindex; scale the rest column-wise.
+        positions = [numerical_cols.index(col) for col in present]
+        data[present] = (data[present] - scaler.mean_[positions]) / scaler.scale_[positions]
+    elif present:
+        data[numerical_cols] = scaler.transform(data[numerical_cols])
     logger.debug("Numerical data scaled using StandardScaler.")
     return data
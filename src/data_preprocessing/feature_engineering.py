@@ -1,81 +1,73 @@
-import pandas as pd
-import numpy as np
-import logging
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-import yaml
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.feature_selection import SelectFromModel
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-import pandas.api.types as ptypes
+from config_loader import load_config
+from reporting import report_correlation
+from .correlation_pruning import fit_correlation_pruning
+from .feature_generation import plan_generated_features, generate_features
+from .feature_selection import fit_feature_selection
 
-def feature_engineering_and_correlation(data, logger):
-    """Performs feature engineering and correlation analysis using config parameters."""
-    with open("config/config.yaml", "r") as file:
-        config = yaml.safe_load(file)
+def feature_engineering_and_correlation(data, logger, target=None, config=None, target_column=None):
+    """Performs feature engineering and correlation analysis using config parameters.
 
-    fe_config = config["feature_engineering"]
+    The target is either the aligned Series `target` or the name of a column of `data`
+    (`target_column`, e.g. from --target), which is then excluded from the features.
+    """
+    config = config or load_config()
+    if target_column is not None:
+        target = data[target_column]
+        data = data.drop(columns=[target_column])
+    fe_config = config.feature_engineering
+    state = fit_feature_engineering(data, target, fe_config, logger)
+    return apply_feature_engineering(data, state, logger)
 
-    logger.debug("Calculating correlation matrix.")
-    corr_matrix = data.corr().abs()
+def fit_feature_engineering(data, target, fe_config, logger):
+    """Learns the correlation drop list, generated polynomial/interaction terms and selected features.
 
-    # Generate and save correlation matrix heatmap
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(corr_matrix, annot=True, cmap="coolwarm")
-    output_path = logging.getLogger().handlers[0].baseFilename
-    if output_path:
-        output_dir = os.path.dirname(output_path)
-        plt.savefig(os.path.join(output_dir, "correlation_matrix.png"))
-        logger.debug(f"Correlation matrix heatmap saved to: {os.path.join(output_dir, 'correlation_matrix.png')}")
-    else:
-        logger.warning("Could not find output directory for correlation_matrix.png")
-    plt.close() # Close the plot to prevent showing it
+    `data` holds the features only; `target` is the aligned target Series (or None).
+    """
+    state = {}
 
-    # Identify highly correlated features
-    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
-    to_drop = [column for column in upper.columns if any(upper[column] > fe_config["correlation_threshold"])]
+    # Rendered from a sample in the background, only when reporting is enabled.
+    report_correlation(data)
 
-    logger.debug(f"Highly correlated features to drop: {to_drop}")
-    data.drop(to_drop, axis=1, inplace=True)
+    # Identify highly correlated features; the decision is stored so inference never recomputes correlations
+    logger.debug("Calculating correlated feature pairs.")
+    state["to_drop"] = fit_correlation_pruning(data, target, fe_config.correlation_threshold,
+                                               fe_config.correlation_pruning, logger)
+    logger.debug(f"Highly correlated features to drop: {state['to_drop']}")
+    data = data.drop(state["to_drop"], axis=1)
 
-    # Polynomial Features
-    if fe_config["polynomial_degree"] > 1:
-        poly = PolynomialFeatures(degree=fe_config["polynomial_degree"])
-        poly_features = poly.fit_transform(data.select_dtypes(include=np.number))
-        poly_feature_names = poly.get_feature_names_out(data.select_dtypes(include=np.number).columns)
-        data = pd.concat([data.drop(data.select_dtypes(include=np.number).columns, axis=1), pd.DataFrame(poly_features, columns=poly_feature_names)], axis=1)
-        logger.debug(f"Polynomial features of degree {fe_config['polynomial_degree']} created.")
+    # Polynomial and Interaction Features, generated within the configured budget
+    pairs = fe_config.interaction_features.pairs if fe_config.interaction_features.enabled else ()
+    state["block_size"] = fe_config.feature_generation.block_size
+    state["generated_terms"] = plan_generated_features(data, target, fe_config.polynomial_degree, pairs,
+                                                       fe_config.feature_generation, logger)
+    data = generate_features(data, state["generated_terms"], state["block_size"])
+    logger.debug(f"Generated {len(state['generated_terms'])} polynomial/interaction features.")
 
-    # Interaction Features
-    if fe_config["interaction_features"]["enabled"]:
-        for pair in fe_config["interaction_features"]["pairs"]:
-            if all(col in data.columns for col in pair):
-                data[f"{pair[0]}_x_{pair[1]}"] = data[pair[0]] * data[pair[1]]
-                logger.debug(f"Interaction feature {pair[0]}_x_{pair[1]} created.")
-
-    # Model-Based Feature Selection
-    if fe_config["feature_selection"]["enabled"] and fe_config["feature_selection"]["model_based"]["enabled"]:
-        if "target" in data.columns:
-            target_column = "target"
-        elif "target_column" in data.columns:
-            target_column = "target_column"
-        else:
-            target_column = None
-
-        if target_column:
+    # Model-Based Feature Selection: one importance model on a row sample, ranking cached
+    state["selected_features"] = None
+    model_based = fe_config.feature_selection.model_based
+    if fe_config.feature_selection.enabled and model_based.enabled:
+        if target is not None:
             try:
-                if ptypes.is_numeric_dtype(data[target_column]):
-                    model = RandomForestRegressor(n_estimators=100, random_state=42)
-                else:
-                    model = RandomForestClassifier(n_estimators=100, random_state=42)
-                model.fit(data.drop(target_column, axis=1), data[target_column])
-                sfm = SelectFromModel(model, max_features=fe_config["feature_selection"]["model_based"]["num_features"])
-                sfm.fit(data.drop(target_column, axis=1), data[target_column])
-                selected_features = data.columns[sfm.get_support()]
-                data = data[list(selected_features) + [target_column]]
-                logger.debug(f"Model-based feature selection applied. Selected features: {selected_features}")
+                state["selected_features"], importances = fit_feature_selection(data, target, model_based, logger)
+                state["feature_importances"] = importances.to_dict()
+                # Only generate the terms that survived selection at inference time.
+                selected = set(state["selected_features"])
+                state["generated_terms"] = [term for term in state["generated_terms"] if term[0] in selected]
+                logger.debug(f"Model-based feature selection applied. Selected features: {state['selected_features']}")
             except Exception as e:
                 logger.error(f"Error during model-based feature selection: {e}")
+        else:
+            logger.warning("Model-based feature selection needs a target; skipping it.")
+
+    return state
 
+def apply_feature_engineering(data, state, logger):
+    """Replays the learned feature engineering steps."""
+    data = data.drop([col for col in state["to_drop"] if col in data.columns], axis=1)
+    data = generate_features(data, state["generated_terms"], state["block_size"])
+    if state["selected_features"] is not None:
+        # Missing selected columns are left to the preprocessor's final reindex, which fills and reports them.
+        data = data.reindex(columns=[col for col in state["selected_features"] if col in data.columns])
+    logger.debug(f"Feature engineering applied; {data.shape[1]} features.")
     return data
@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import math
+import pandas as pd
+import numpy as np
+import pandas.api.types as ptypes
+from sklearn.feature_selection import mutual_info_classif, mutual_info_regression
+
+BYTES_PER_FEATURE_VALUE = np.dtype(np.float32).itemsize
+
+def estimate_polynomial_width(n_features, degree):
+    """Returns how many product terms of degree 2..`degree` a full expansion of `n_features` produces."""
+    return sum(math.comb(n_features + k - 1, k) for k in range(2, degree + 1))
+
+def estimate_memory_mb(n_rows, n_features):
+    """Returns the float32 memory needed for `n_features` generated columns."""
+    return n_rows * n_features * BYTES_PER_FEATURE_VALUE / 1024 ** 2
+
+def rank_candidates(data, target, generation_config, logger):
+    """Scores numerical columns by their relationship with the target on a row sample.
+
+    Without a target the columns keep their original order.
+    """
+    numeric = data.select_dtypes(include=np.number)
+    if target is None or numeric.empty:
+        return pd.Series(1.0, index=numeric.columns)
+
+    if len(numeric) > generation_config.sample_rows:
+        numeric = numeric.sample(n=generation_config.sample_rows, random_state=generation_config.random_state)
+    target = target.loc[numeric.index]
+    values = numeric.to_numpy(dtype=np.float32)
+
+    if generation_config.ranking == "mutual_info":
+        if ptypes.is_numeric_dtype(target):
+            scores = mutual_info_regression(values, target, random_state=generation_config.random_state)
+        else:
+            scores = mutual_info_classif(values, target, random_state=generation_config.random_state)
+    else:
+        codes = target.to_numpy(dtype=np.float64) if ptypes.is_numeric_dtype(target) else pd.factorize(target)[0]
+        centered = values - values.mean(axis=0)
+        centered_target = (codes - codes.mean()).astype(np.float32)
+        denominator = np.sqrt((centered ** 2).sum(axis=0) * (centered_target ** 2).sum())
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.abs(centered_target @ centered) / denominator
+    scores = pd.Series(np.nan_to_num(scores), index=numeric.columns)
+    logger.debug(f"Candidate scores ({generation_config.ranking}): {scores.sort_values(ascending=False).head(10).to_dict()}")
+    return scores
+
+def plan_generated_features(data, target, degree, pairs, generation_config, logger):
+    """Chooses the product terms to generate within the feature and memory budget.
+
+    Explicit interaction pairs come first, then polynomial terms over the highest
+    ranked candidate columns, ordered by the product of their scores. Returns a list
+    of (name, columns) tuples; nothing is materialized here.
+    """
+    numeric_cols = list(data.select_dtypes(include=np.number).columns)
+    budget = generation_config.max_features
+    if generation_config.max_memory_mb is not None:
+        budget = min(budget, int(generation_config.max_memory_mb * 1024 ** 2 / (max(len(data), 1) * BYTES_PER_FEATURE_VALUE)))
+
+    terms = []
+    for first, second in pairs:
+        if first in numeric_cols and second in numeric_cols:
+            terms.append((f"{first}_x_{second}", (first, second)))
+
+    if degree > 1 and numeric_cols:
+        full_width = estimate_polynomial_width(len(numeric_cols), degree)
+        logger.debug(f"Full degree-{degree} expansion of {len(numeric_cols)} columns would add {full_width} features "
+                     f"({estimate_memory_mb(len(data), full_width):.1f} MB as float32).")
+
+        scores = rank_candidates(data, target, generation_config, logger)
+        candidates = list(scores.sort_values(ascending=False, kind="stable").index[:generation_config.max_candidates])
+        combos = (combo for k in range(2, degree + 1)
+                  for combo in itertools.combinations_with_replacement(candidates, k))
+        # Keep only the best-scoring terms that fit the budget instead of listing every combination.
+        poly_terms = heapq.nlargest(max(budget - len(terms), 0), combos,
+                                    key=lambda combo: math.prod(scores[col] for col in combo))
+        terms.extend((_term_name(combo), combo) for combo in poly_terms)
+
+    if len(terms) > budget:
+        logger.debug(f"Feature budget of {budget} columns keeps {budget} of {len(terms)} planned terms.")
+        terms = terms[:budget]
+    logger.debug(f"Planned {len(terms)} generated features "
+                 f"({estimate_memory_mb(len(data), len(terms)):.1f} MB as float32).")
+    return terms
+
+def generate_features(data, terms, block_size):
+    """Materializes the planned product terms as float32 column blocks and appends them once.
+
+    Terms whose source columns are missing (possible at inference) are skipped; the
+    preprocessor fills their columns with 0 and warns.
+    """
+    terms = [(name, combo) for name, combo in terms if all(col in data.columns for col in combo)]
+    if not terms:
+        return data
+    source_cols = sorted({col for _, combo in terms for col in combo}, key=list(data.columns).index)
+    position = {col: i for i, col in enumerate(source_cols)}
+    source = np.asfortranarray(data[source_cols].to_numpy(dtype=np.float32))
+
+    blocks = []
+    for start in range(0, len(terms), block_size):
+        chunk = terms[start:start + block_size]
+        block = np.empty((len(data), len(chunk)), dtype=np.float32, order="F")
+        for j, (_, combo) in enumerate(chunk):
+            np.copyto(block[:, j], source[:, position[combo[0]]])
+            for col in combo[1:]:
+                block[:, j] *= source[:, position[col]]
+        blocks.append(pd.DataFrame(block, index=data.index, columns=[name for name, _ in chunk]))
+    return pd.concat([data] + blocks, axis=1)
+
+def _term_name(combo):
+    """Names a product term like scikit-learn's PolynomialFeatures, e.g. 'a^2 b'."""
+    counts = {}
+    for col in combo:
+        counts[col] = counts.get(col, 0) + 1
+    return " ".join(col if power == 1 else f"{col}^{power}" for col, power in counts.items())
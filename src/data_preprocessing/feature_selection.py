@@ -0,0 +1,118 @@
+import hashlib
+import os
+from collections import OrderedDict
+import joblib
+import numpy as np
+import pandas as pd
+import pandas.api.types as ptypes
+from sklearn.ensemble import (HistGradientBoostingClassifier, HistGradientBoostingRegressor,
+                              RandomForestClassifier, RandomForestRegressor)
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import train_test_split
+
+# Importance rankings computed in this process, most recently used last.
+_ranking_cache = OrderedDict()
+RANKING_CACHE_SIZE = 8
+
+def fit_feature_selection(data, target, selection_config, logger):
+    """Selects at most `num_features` columns whose importance is at least the mean importance.
+
+    This is the rule of scikit-learn's SelectFromModel with its default threshold, applied
+    to a ranking from a single importance model (see `rank_features`). Returns the selected
+    columns in their original order and the full importance ranking.
+    """
+    importances = rank_features(data, target, selection_config, logger)
+    candidates = importances[importances >= importances.mean()]
+    top = set(candidates.nlargest(selection_config.num_features).index)
+    selected = [col for col in data.columns if col in top]
+    logger.debug(f"Selected {len(selected)} of {data.shape[1]} features by {selection_config.importance} importance.")
+    return selected, importances
+
+def rank_features(data, target, selection_config, logger):
+    """Returns the feature importances of one model fitted on a (stratified) row sample.
+
+    `impurity` uses the random forest's built-in importances; `permutation` scores the
+    model on a held-out subsample instead, which also works for histogram gradient
+    boosting. Rankings are cached by the sampled data, the target and the ranking
+    settings, in memory and, with `cache_dir`, on disk across runs.
+    """
+    sample, sample_target = _sample_rows(data, target, selection_config.sample_rows, selection_config.random_state)
+    key = _ranking_key(sample, sample_target, selection_config)
+    cache_path = os.path.join(selection_config.cache_dir, f"ranking-{key}.joblib") if selection_config.cache_dir else None
+
+    if key in _ranking_cache:
+        _ranking_cache.move_to_end(key)
+        logger.debug("Feature importance ranking reused from memory.")
+        return _ranking_cache[key]
+    if cache_path and os.path.exists(cache_path):
+        importances = joblib.load(cache_path)
+        logger.debug(f"Feature importance ranking loaded from: {cache_path}")
+    else:
+        importances = _compute_importances(sample, sample_target, selection_config, logger)
+        if cache_path:
+            os.makedirs(selection_config.cache_dir, exist_ok=True)
+            joblib.dump(importances, cache_path)
+
+    _ranking_cache[key] = importances
+    while len(_ranking_cache) > RANKING_CACHE_SIZE:
+        _ranking_cache.popitem(last=False)
+    return importances
+
+def clear_ranking_cache():
+    """Forgets the rankings cached in memory (disk entries in `cache_dir` are kept)."""
+    _ranking_cache.clear()
+
+def _compute_importances(data, target, selection_config, logger):
+    classification = not ptypes.is_numeric_dtype(target)
+    model = _make_model(selection_config, classification)
+    values = data.to_numpy(dtype=np.float32)
+
+    if selection_config.importance == "impurity":
+        model.fit(values, target)
+        importances = model.feature_importances_
+    else:
+        holdout_size = min(selection_config.permutation_rows, len(data) // 2)
+        stratify = target if classification and _can_stratify(target, holdout_size) else None
+        X_fit, X_hold, y_fit, y_hold = train_test_split(values, target, test_size=holdout_size, stratify=stratify,
+                                                        random_state=selection_config.random_state)
+        model.fit(X_fit, y_fit)
+        result = permutation_importance(model, X_hold, y_hold, n_repeats=selection_config.permutation_repeats,
+                                        n_jobs=selection_config.n_jobs, random_state=selection_config.random_state)
+        importances = result.importances_mean
+
+    logger.debug(f"Feature importances from {selection_config.estimator} ({selection_config.importance}) "
+                 f"on {len(data)} rows.")
+    return pd.Series(importances, index=data.columns).sort_values(ascending=False, kind="stable")
+
+def _make_model(selection_config, classification):
+    if selection_config.estimator == "hist_gradient_boosting":
+        estimator = HistGradientBoostingClassifier if classification else HistGradientBoostingRegressor
+        return estimator(random_state=selection_config.random_state)
+    estimator = RandomForestClassifier if classification else RandomForestRegressor
+    return estimator(n_estimators=selection_config.n_estimators, n_jobs=selection_config.n_jobs,
+                     random_state=selection_config.random_state)
+
+def _sample_rows(data, target, sample_rows, random_state):
+    """Returns at most `sample_rows` rows, stratified by class for categorical targets."""
+    if len(data) <= sample_rows:
+        return data, target
+    classification = not ptypes.is_numeric_dtype(target)
+    stratify = target if classification and _can_stratify(target, sample_rows) else None
+    sample, _, sample_target, _ = train_test_split(data, target, train_size=sample_rows, stratify=stratify,
+                                                   random_state=random_state)
+    return sample, sample_target
+
+def _can_stratify(target, n_rows):
+    counts = target.value_counts()
+    return counts.min() >= 2 and n_rows >= len(counts)
+
+def _ranking_key(data, target, selection_config):
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(target, index=False).to_numpy().tobytes())
+    # num_features only affects the cut, not the ranking.
+    settings = (list(data.columns), selection_config.estimator, selection_config.importance,
+                selection_config.n_estimators, selection_config.permutation_rows,
+                selection_config.permutation_repeats, selection_config.random_state)
+    digest.update(repr(settings).encode())
+    return digest.hexdigest()[:32]
@@ -1,41 +1,72 @@
 import pandas as pd
 import pandas.api.types as ptypes
 
-def handle_missing_data(data, logger):
+# Suffix of the optional missing-indicator columns.
+INDICATOR_SUFFIX = "_missing"
+
+def handle_missing_data(data, logger, missing_config=None):
     """Handles missing data in a pandas DataFrame with enhanced strategies."""
-    missing_percentages = data.isnull().sum() / len(data) * 100
-
-    for col, percentage in missing_percentages.items():
-        if percentage > 0:
-            logger.debug(f"Missing percentage in '{col}': {percentage:.2f}%")
-            if percentage <= 5:
-                logger.debug(f"Removing rows with missing values in '{col}'.")
-                data.dropna(subset=[col], inplace=True)
-            else:
-                if ptypes.is_numeric_dtype(data[col]):
-                    logger.debug(f"Handling missing numerical values in '{col}'.")
-                    data = handle_numerical_missing(data, col, logger)
-                else:
-                    logger.debug(f"Imputing missing categorical values in '{col}' with mode.")
-                    data[col].fillna(data[col].mode()[0], inplace=True)
-    return data
+    max_percentage = missing_config.drop_rows_max_percentage if missing_config else 5
+    data = drop_sparse_missing_rows(data, logger, max_percentage)
+    state = fit_missing_values(data, logger, missing_config)
+    return apply_missing_values(data, state, logger)
+
+def drop_sparse_missing_rows(data, logger, max_percentage=5):
+    """Drops rows with missing values in columns that are at most `max_percentage` percent missing.
+
+    The columns are chosen from a single `isna()` pass and the rows are removed with one
+    combined mask, so the result does not depend on column order. Only used on training
+    data; inference never drops rows.
+    """
+    missing = data.isna()
+    missing_percentages = missing.mean() * 100
+    sparse_cols = missing_percentages[(missing_percentages > 0) & (missing_percentages <= max_percentage)].index
+    if sparse_cols.empty:
+        return data
+
+    row_mask = missing[sparse_cols].any(axis=1)
+    logger.debug(f"Removing {int(row_mask.sum())} rows with missing values in {list(sparse_cols)} "
+                 f"(each at most {max_percentage}% missing).")
+    return data[~row_mask]
+
+def fit_missing_values(data, logger, missing_config=None):
+    """Learns a fill value for every column: the median for numerical, the mode for categorical.
+
+    Strategies come from one `isna()` pass and the medians and modes are each computed in
+    one vectorized call. Returns the state replayed by `apply_missing_values`: the fill
+    values and, when `add_indicators` is set, the columns that get a missing indicator.
+    """
+    missing_counts = data.isna().sum()
+    numeric_cols = [col for col in data.columns if ptypes.is_numeric_dtype(data[col])]
+    other_cols = [col for col in data.columns if col not in set(numeric_cols)]
+
+    fill_values = {}
+    if numeric_cols:
+        fill_values.update(data[numeric_cols].median().to_dict())
+    if other_cols:
+        modes = data[other_cols].mode(dropna=True)
+        if not modes.empty:
+            fill_values.update(modes.iloc[0].to_dict())
+    fill_values = {col: value for col, value in fill_values.items() if pd.notna(value)}
+
+    incomplete = missing_counts[missing_counts > 0]
+    for col, count in incomplete.items():
+        strategy = "median" if col in numeric_cols else "mode"
+        logger.debug(f"Imputing missing values in '{col}' ({count / len(data) * 100:.2f}% missing) with {strategy}.")
+
+    add_indicators = missing_config.add_indicators if missing_config else False
+    return {"fill_values": fill_values,
+            "indicator_columns": list(incomplete.index) if add_indicators else []}
 
-def handle_numerical_missing(data, col, logger):
-    # (Same numerical missing data handling code as before)
-    missing_percentage = data[col].isnull().sum() / len(data) * 100
-    if missing_percentage > 0:
-        if missing_percentage > 30: # If more than 30% missing, use median
-            logger.debug(f"Imputing missing numerical values in '{col}' with median due to high missing percentage.")
-            data[col].fillna(data[col].median(), inplace=True)
-        else: # If less, try interpolation
-            try:
-                logger.debug(f"Attempting linear interpolation for missing values in '{col}'.")
-                data[col].interpolate(method='linear', limit_direction='both', inplace=True)
-                if data[col].isnull().sum() > 0: # If interpolation still has nulls, use median
-                    logger.debug(f"Linear interpolation failed, using median for remaining nulls in '{col}'.")
-                    data[col].fillna(data[col].median(), inplace=True)
-            except Exception as e:
-                logger.debug(f"Interpolation failed for '{col}': {e}. Using median imputation.")
-                data[col].fillna(data[col].median(), inplace=True)
+def apply_missing_values(data, state, logger):
+    """Adds the missing indicators, then fills missing values with the learned fill values in one call."""
+    indicator_cols = [col for col in state["indicator_columns"] if col in data.columns]
+    if indicator_cols:
+        # Boolean indicators are left alone by the numerical stages (outliers, skew, scaling).
+        indicators = data[indicator_cols].isna().add_suffix(INDICATOR_SUFFIX)
+        data = pd.concat([data, indicators], axis=1)
 
+    fill_values = {col: value for col, value in state["fill_values"].items() if col in data.columns}
+    data = data.fillna(value=fill_values)
+    logger.debug(f"Missing values imputed with learned fill values; {len(indicator_cols)} indicator columns added.")
     return data
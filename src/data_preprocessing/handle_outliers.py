@@ -1,66 +1,49 @@
 import pandas as pd
 import numpy as np
 import logging
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
+from reporting import report_outliers
 
-def handle_outliers(data, logger):
-    # (Same handle_outliers and handle_outlier_iteration functions as before)
-    outlier_data = pd.DataFrame()  # To store outlier data for the graph
-    for col in data.select_dtypes(include=np.number).columns:
-        logger.debug(f"Handling outliers in column: {col}")
-        try:
-            # Visualize outliers (Boxplot)
-            plt.figure(figsize=(8, 6))
-            sns.boxplot(x=data[col])
-            plt.title(f"Boxplot of {col}")
-            plt.close() # Close plot to avoid showing
-            # Identify outliers using IQR
-            Q1 = data[col].quantile(0.25)
-            Q3 = data[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            outliers = data[(data[col] < lower_bound) | (data[col] > upper_bound)]
+def handle_outliers(data, logger, outlier_config=None):
+    """Caps outliers in every numerical column at the IQR fences."""
+    bounds = fit_outlier_bounds(data, logger, outlier_config)
+    return apply_outlier_bounds(data, bounds, logger)
 
-            if not outliers.empty:
-                logger.debug(f"Found {len(outliers)} outliers in column: {col}")
-                outlier_data[col] = outliers[col]  # Store outlier data
-                data = handle_outlier_iteration(data, col, lower_bound, upper_bound, logger)
-            else:
-                logger.debug(f"No outliers found in column: {col}")
+def fit_outlier_bounds(data, logger, outlier_config=None):
+    """Learns the IQR fences of every numerical column in one vectorized pass.
 
-        except Exception as e:
-            logger.error(f"Error handling outliers in column {col}: {e}")
+    Returns a DataFrame indexed by column with `lower` and `upper` bounds. In
+    `approximate` mode the quartiles are estimated from a uniform row sample,
+    which bounds the cost on data too large for exact quantiles.
+    """
+    method = outlier_config.method if outlier_config else "exact"
+    iqr_multiplier = outlier_config.iqr_multiplier if outlier_config else 1.5
 
-    # Generate data insights graph if outliers are found
-    if not outlier_data.empty:
-        plt.figure(figsize=(12, 8))
-        sns.boxplot(data=outlier_data)
-        plt.title("Data Insights: Outlier Distribution")
-        output_path = logging.getLogger().handlers[0].baseFilename  # Get the log file path
-        if output_path:
-            output_dir = os.path.dirname(output_path)
-            plt.savefig(os.path.join(output_dir, "data_insights.png"))
-            logger.debug(f"Data insights graph saved to: {os.path.join(output_dir, 'data_insights.png')}")
-        else:
-            logger.warning("Could not find output directory for data_insights.png")
-        plt.close()
-    return data
+    numeric = data.select_dtypes(include=np.number)
+    if method == "approximate" and len(numeric) > outlier_config.sample_rows:
+        logger.debug(f"Estimating quartiles from {outlier_config.sample_rows} sampled rows.")
+        sample = numeric.sample(n=outlier_config.sample_rows, random_state=outlier_config.random_state)
+    else:
+        sample = numeric
+
+    quartiles = sample.quantile([0.25, 0.75])
+    iqr = quartiles.loc[0.75] - quartiles.loc[0.25]
+    bounds = pd.DataFrame({"lower": quartiles.loc[0.25] - iqr_multiplier * iqr,
+                           "upper": quartiles.loc[0.75] + iqr_multiplier * iqr})
 
-def handle_outlier_iteration(data, col, lower_bound, upper_bound, logger):
-    # (Same handle_outlier_iteration function as before)
-    original_data = data[col].copy()
+    if logger.isEnabledFor(logging.DEBUG):
+        num_outliers = (numeric.lt(bounds["lower"], axis=1) | numeric.gt(bounds["upper"], axis=1)).sum()
+        for col, count in num_outliers[num_outliers > 0].items():
+            logger.debug(f"Found {count} outliers in column: {col}")
 
-    # 1. Capping (Winsorizing)
-    capped_data = original_data.copy()
-    capped_data[capped_data < lower_bound] = lower_bound
-    capped_data[capped_data > upper_bound] = upper_bound
-    data[col] = capped_data
-    logger.debug(f"Capped outliers in column: {col}")
+    # Rendered from a sample in the background, only when reporting is enabled.
+    report_outliers(data, bounds)
+    return bounds
 
-    # 2. Transformation (Log, Square Root)
-    if (original_data > 0).all():  # Check for positive values
-        transformed_data = np.log1p(original_data)
-        outliers_transformed = transformed_data[(transformed_data < np.log1p(lower_bound)) | (transformed_data > np.log1p(upper_bound))]
+def apply_outlier_bounds(data, bounds, logger):
+    """Caps (winsorizes) values outside the learned bounds with a single broadcast clip."""
+    bounds = bounds[bounds.index.isin(data.columns)]
+    columns = list(bounds.index)
+    if columns:
+        data[columns] = data[columns].clip(lower=bounds["lower"], upper=bounds["upper"], axis=1)
+    logger.debug(f"Capped outliers in {len(columns)} columns.")
+    return data
@@ -0,0 +1,27 @@
+import numpy as np
+
+def reduce_skewness(data, logger, skew_threshold=0.75, exclude=()):
+    """Log-transforms non-negative numerical columns whose skewness exceeds the threshold."""
+    columns = fit_skewed_columns(data, logger, skew_threshold, exclude)
+    return apply_skew_transform(data, columns, logger)
+
+def fit_skewed_columns(data, logger, skew_threshold=0.75, exclude=()):
+    """Returns the numerical columns that should be log-transformed."""
+    columns = []
+    for col in data.select_dtypes(include=np.number).columns:
+        if col in exclude:
+            continue
+        skewness = data[col].skew()
+        if abs(skewness) > skew_threshold and data[col].min() >= 0:
+            logger.debug(f"Reducing skewness in column: {col} (skew={skewness:.2f})")
+            columns.append(col)
+    return columns
+
+def apply_skew_transform(data, columns, logger):
+    """Applies log1p to the learned skewed columns."""
+    columns = [col for col in columns if col in data.columns]
+    if columns:
+        # Values below the training minimum of zero are floored so log1p stays defined.
+        data[columns] = np.log1p(data[columns].clip(lower=0))
+    logger.debug(f"Log-transformed {len(columns)} skewed columns.")
+    return data
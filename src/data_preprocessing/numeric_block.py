@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from .handle_missing_data import INDICATOR_SUFFIX, fit_missing_values, apply_missing_values
+from .handle_outliers import fit_outlier_bounds
+from .handle_skew import fit_skewed_columns
+
+class NumericBlock:
+    """Numerical columns held in one contiguous array, with the other columns kept alongside.
+
+    The values are stored column-major, so every column is a contiguous view that the
+    numerical stages (missing values, outliers, skew, scaling) update in place instead of
+    copying frames. The fit functions read the block through a zero-copy DataFrame view.
+    `to_frame` rebuilds a DataFrame in the original column order for the stages that
+    change the columns (encoding, feature engineering).
+    """
+
+    def __init__(self, values, columns, other, order):
+        self.values = values
+        self.columns = list(columns)
+        self.positions = {col: i for i, col in enumerate(self.columns)}
+        self.other = other
+        self.order = list(order)
+
+    @classmethod
+    def from_frame(cls, data, dtype="float32", columns=None):
+        """Copies the dense numerical columns of `data` into a block of `dtype`, one column at a time.
+
+        `columns` fixes the block's columns (those present in `data` are taken), so inference
+        builds the fitted block even when a column's dtype differs from training.
+        """
+        if columns is None:
+            columns = [col for col in data.select_dtypes(include=np.number).columns
+                       if not isinstance(data[col].dtype, pd.SparseDtype)]
+        else:
+            columns = [col for col in columns if col in data.columns]
+        values = np.empty((len(data), len(columns)), dtype=dtype, order="F")
+        for i, col in enumerate(columns):
+            series = data[col]
+            # Plain NumPy columns are cast straight into the block; nullable ones need their NA as NaN.
+            source = (series.to_numpy() if isinstance(series.dtype, np.dtype)
+                      else series.to_numpy(dtype="float64", na_value=np.nan))
+            np.copyto(values[:, i], source, casting="unsafe")
+        return cls(values, columns, data.drop(columns=columns), data.columns)
+
+    @property
+    def shape(self):
+        return (len(self.values), len(self.order))
+
+    def numeric_frame(self):
+        """Returns a DataFrame view of the block; it shares memory and must only be read."""
+        return pd.DataFrame(self.values, index=self.other.index, columns=self.columns, copy=False)
+
+    def column(self, col):
+        """Returns the contiguous, writable view of one column."""
+        return self.values[:, self.positions[col]]
+
+    def to_frame(self):
+        numeric = self.numeric_frame()
+        return pd.concat([numeric, self.other], axis=1)[self.order]
+
+def fit_block_missing_values(block, logger, missing_config=None):
+    """Learns the same state as `fit_missing_values`, reading the block and the other columns separately."""
+    numeric = fit_missing_values(block.numeric_frame(), logger, missing_config)
+    other = fit_missing_values(block.other, logger, missing_config)
+    indicators = set(numeric["indicator_columns"]) | set(other["indicator_columns"])
+    return {"fill_values": {**numeric["fill_values"], **other["fill_values"]},
+            "indicator_columns": [col for col in block.order if col in indicators]}
+
+def apply_block_missing_values(block, state, logger):
+    """Adds the missing indicators, then fills the block's NaNs in place."""
+    indicator_cols = [col for col in state["indicator_columns"] if col in block.order]
+    if indicator_cols:
+        indicators = pd.DataFrame({f"{col}{INDICATOR_SUFFIX}": (np.isnan(block.column(col)) if col in block.positions
+                                                                 else block.other[col].isna().to_numpy())
+                                   for col in indicator_cols}, index=block.other.index)
+        block.other = pd.concat([block.other, indicators], axis=1)
+        block.order += list(indicators.columns)
+
+    for col, value in state["fill_values"].items():
+        if col in block.positions:
+            column = block.column(col)
+            np.copyto(column, value, casting="unsafe", where=np.isnan(column))
+    other_fills = {"fill_values": state["fill_values"], "indicator_columns": []}
+    block.other = apply_missing_values(block.other, other_fills, logger)
+    return block
+
+def fit_block_outlier_bounds(block, logger, outlier_config=None):
+    return fit_outlier_bounds(block.numeric_frame(), logger, outlier_config)
+
+def apply_block_outlier_bounds(block, bounds, logger):
+    """Caps values outside the learned bounds in place."""
+    capped = 0
+    for col, lower, upper in bounds.itertuples():
+        if col not in block.positions:
+            continue
+        column = block.column(col)
+        # A bound is NaN for a column that was empty at fit time; it then leaves the column alone.
+        if pd.notna(lower):
+            np.maximum(column, lower, out=column, casting="unsafe")
+        if pd.notna(upper):
+            np.minimum(column, upper, out=column, casting="unsafe")
+        capped += 1
+    logger.debug(f"Capped outliers in {capped} columns in place.")
+    return block
+
+def fit_block_skewed_columns(block, logger, skew_threshold=0.75, exclude=()):
+    return fit_skewed_columns(block.numeric_frame(), logger, skew_threshold, exclude)
+
+def apply_block_skew_transform(block, columns, logger):
+    """Applies log1p to the learned skewed columns in place."""
+    columns = [col for col in columns if col in block.positions]
+    for col in columns:
+        column = block.column(col)
+        np.maximum(column, 0, out=column)
+        np.log1p(column, out=column)
+    logger.debug(f"Log-transformed {len(columns)} skewed columns in place.")
+    return block
+
+def fit_block_scaler(block, logger):
+    """Fits a StandardScaler on the block's columns, like `fit_scaler` on the dense numerical columns."""
+    scaler = StandardScaler()
+    if block.columns:
+        scaler.fit(block.numeric_frame())
+    return block.columns, scaler
+
+def apply_block_scaler(block, fitted_scaler, logger):
+    """Standardizes the fitted columns in place with the scaler's mean and scale."""
+    numerical_cols, scaler = fitted_scaler
+    if numerical_cols:
+        for col, mean, scale in zip(numerical_cols, scaler.mean_, scaler.scale_):
+            if col in block.positions:
+                column = block.column(col)
+                column -= mean
+                column /= scale
+    logger.debug("Numerical data scaled in place.")
+    return block
+
+# Fit and apply functions of the numerical stages when they run on a NumericBlock.
+BLOCK_STAGES = {"missing_values": (fit_block_missing_values, apply_block_missing_values),
+                "outliers": (fit_block_outlier_bounds, apply_block_outlier_bounds),
+                "skew": (fit_block_skewed_columns, apply_block_skew_transform),
+                "scaling": (fit_block_scaler, apply_block_scaler)}
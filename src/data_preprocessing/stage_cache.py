@@ -0,0 +1,115 @@
+import functools
+import glob
+import hashlib
+import os
+import platform
+import time
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+class StageCache:
+    """Content-addressed disk cache for the fitted state and output of preprocessing stages.
+
+    The key of a stage chains the key of the previous stage with the stage name, its
+    config and `code_version()` (sources and library versions), starting from a hash of
+    the input frame and target. A stage therefore hits only when its input, its settings
+    and every earlier stage are unchanged. Entries are evicted least recently used once the cache
+    directory exceeds `max_size_mb`. A disabled cache simply runs every stage.
+    """
+
+    def __init__(self, cache_config, logger):
+        self.enabled = cache_config.enabled
+        self.directory = cache_config.directory
+        self.max_bytes = cache_config.max_size_mb * 1024 ** 2
+        self.logger = logger
+        self.time_saved = 0.0
+        self._key = None
+
+    def start(self, data, target=None):
+        """Derives the root key from the input frame (values, index, columns, dtypes) and target."""
+        if not self.enabled:
+            return
+        digest = hashlib.sha256(code_version().encode())
+        for frame in (data, target):
+            if frame is None:
+                continue
+            digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+            columns = frame.dtypes.items() if isinstance(frame, pd.DataFrame) else [(frame.name, frame.dtype)]
+            digest.update(repr([(str(name), str(dtype)) for name, dtype in columns]).encode())
+        self._key = digest.hexdigest()
+
+    def run(self, stage, settings, compute):
+        """Returns the cached result of `compute()` for this stage, computing and storing it on a miss."""
+        if not self.enabled:
+            return compute()
+        self._key = hashlib.sha256(f"{self._key}:{stage}:{settings!r}".encode()).hexdigest()
+        path = os.path.join(self.directory, f"{stage}-{self._key[:32]}.joblib")
+
+        if os.path.exists(path):
+            start = time.perf_counter()
+            try:
+                entry = joblib.load(path)
+            except Exception as e:
+                self.logger.warning(f"Stage cache entry {path} is unreadable and will be recomputed: {e}")
+            else:
+                os.utime(path)
+                saved = max(entry["seconds"] - (time.perf_counter() - start), 0.0)
+                self.time_saved += saved
+                self.logger.info(f"Stage '{stage}': cache hit, saved {saved:.2f}s.")
+                return entry["result"]
+
+        start = time.perf_counter()
+        result = compute()
+        seconds = time.perf_counter() - start
+        self.logger.info(f"Stage '{stage}': cache miss, computed in {seconds:.2f}s.")
+        self._store(path, {"result": result, "seconds": seconds})
+        return result
+
+    def _store(self, path, entry):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            joblib.dump(entry, temp_path)
+            os.replace(temp_path, path)
+        except Exception as e:
+            self.logger.warning(f"Could not write stage cache entry {path}: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        """Removes the least recently used entries until the cache fits in `max_size_mb`."""
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "*.joblib")):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.logger.debug(f"Evicted stage cache entry: {path}")
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Hashes the preprocessing package sources and the Python and library versions.
+
+    Cached entries hold pickled scikit-learn encoders and scalers, so code changes and
+    library upgrades both invalidate them.
+    """
+    digest = hashlib.sha256()
+    versions = (platform.python_version(), np.__version__, pd.__version__, sklearn.__version__)
+    digest.update(repr(versions).encode())
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for path in sorted(glob.glob(os.path.join(package_dir, "*.py"))):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
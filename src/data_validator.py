@@ -1,19 +1,163 @@
+import csv
+import itertools
+import json
 import os
+import numpy as np
 import pandas as pd
 
-def validate_csv_file(file_path, logger):
-    """Validates the input CSV file."""
+# Rows parsed at a time when validating a file without loading it.
+VALIDATION_CHUNKSIZE = 100000
+
+# Columnar formats read through pyarrow, by file extension.
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+FEATHER_EXTENSIONS = (".feather", ".arrow", ".ipc")
+NUMPY_EXTENSIONS = (".npy",)
+
+def validate_file_path(file_path, logger, extensions=(".csv",)):
+    """Checks that the input file exists and has one of the supported extensions."""
     logger.debug(f"Validating file: {file_path}")
 
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
 
-    if not file_path.lower().endswith(".csv"):
-        raise ValueError("Invalid file format. Only CSV files are supported.")
+    if not file_path.lower().endswith(tuple(extensions)):
+        raise ValueError(f"Invalid file format. Supported formats: {', '.join(extensions)}")
+
+def iter_csv_chunks(file_path, logger, chunksize=VALIDATION_CHUNKSIZE, dtype=None, usecols=None):
+    """Yields chunks of a CSV file, validating header and row structure incrementally.
 
+    The raw header is checked once for empty and duplicate names, which pandas would
+    silently invent or rename. Pandas also pads short rows with NaN, so the field count of
+    every row is checked with the csv module alongside each chunk.
+    """
+    validate_file_path(file_path, logger)
+    header = read_csv_header(file_path)
+
+    rows = 0
     try:
-        pd.read_csv(file_path)
-    except pd.errors.ParserError as e:
+        with open(file_path, newline="", encoding="utf-8-sig") as raw, \
+                pd.read_csv(file_path, chunksize=chunksize, dtype=dtype, usecols=usecols) as reader:
+            # Blank lines are skipped by pandas as well.
+            records = filter(None, csv.reader(raw))
+            next(records)
+            for chunk in reader:
+                _check_field_counts(records, len(chunk), len(header), rows)
+                rows += len(chunk)
+                yield chunk
+    except pd.errors.EmptyDataError as e:
         raise ValueError(f"Error reading CSV file: {e}")
+    except pd.errors.ParserError as e:
+        raise ValueError(f"Error reading CSV file after row {rows}: {e}")
+
+    logger.debug(f"Streamed {rows} rows in chunks of {chunksize}.")
+
+def read_csv_header(file_path):
+    """Returns the raw header of a CSV file, rejecting empty and duplicate column names."""
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        raise ValueError(f"Error reading CSV file: no header in {file_path}")
+    empty = [position for position, name in enumerate(header) if not name.strip()]
+    if empty:
+        raise ValueError(f"CSV header has empty column names at positions {empty}.")
+    duplicates = sorted({name for name in header if header.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"CSV header has duplicate column names: {duplicates}")
+    return header
+
+def check_csv_field_counts(file_path, n_rows, width, chunksize=VALIDATION_CHUNKSIZE):
+    """Checks that each of the first `n_rows` records after the header has `width` fields.
+
+    Used after a single-pass read, which pandas pads like the chunked one; the counts are
+    read `chunksize` records at a time.
+    """
+    with open(file_path, newline="", encoding="utf-8-sig") as raw:
+        records = filter(None, csv.reader(raw))
+        next(records)
+        for start in range(0, n_rows, chunksize):
+            _check_field_counts(records, min(chunksize, n_rows - start), width, start)
+
+def _check_field_counts(records, n_rows, width, rows_before):
+    """Reads the next `n_rows` records and checks that each has `width` fields."""
+    counts = np.fromiter(map(len, itertools.islice(records, n_rows)), dtype=np.int64, count=n_rows)
+    bad = np.flatnonzero(counts != width)
+    if len(bad):
+        raise ValueError(f"Row {rows_before + bad[0] + 1} has {counts[bad[0]]} fields, expected {width}.")
+
+def validate_csv_file(file_path, logger, chunksize=VALIDATION_CHUNKSIZE):
+    """Validates the input CSV file without loading it into memory."""
+    for _ in iter_csv_chunks(file_path, logger, chunksize):
+        pass
 
     logger.debug(f"File validated successfully.")
+
+def read_columnar_schema(file_path):
+    """Returns the column names, dtypes and row count of a columnar file without reading its data.
+
+    Parquet and Arrow IPC schemas come from the file metadata; `.npy` files are memory-mapped,
+    so only their header is read. Column names of a `.npy` matrix follow `numpy_column_names`.
+    """
+    lower = file_path.lower()
+    if lower.endswith(NUMPY_EXTENSIONS):
+        matrix = np.load(file_path, mmap_mode="r")
+        if matrix.ndim != 2:
+            raise ValueError(f"Expected a 2-D feature matrix in {file_path}, got shape {matrix.shape}.")
+        names = numpy_column_names(file_path, matrix.shape[1])
+        return {"columns": dict.fromkeys(names, str(matrix.dtype)), "rows": matrix.shape[0]}
+
+    pyarrow = import_pyarrow(file_path)
+    if lower.endswith(PARQUET_EXTENSIONS):
+        import pyarrow.parquet
+        metadata = pyarrow.parquet.read_metadata(file_path)
+        schema, rows = metadata.schema.to_arrow_schema(), metadata.num_rows
+    elif lower.endswith(FEATHER_EXTENSIONS):
+        import pyarrow.ipc
+        with pyarrow.memory_map(file_path) as source:
+            reader = pyarrow.ipc.open_file(source)
+            schema = reader.schema
+            rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    else:
+        raise ValueError(f"Not a columnar file: {file_path}")
+    if len(set(schema.names)) != len(schema.names):
+        raise ValueError(f"File has duplicate column names: {file_path}")
+    # Pandas index columns stored by to_parquet/to_feather are not features.
+    index_columns = [col for col in (schema.pandas_metadata or {}).get("index_columns", []) if isinstance(col, str)]
+    columns = {field.name: str(field.type) for field in schema if field.name not in index_columns}
+    return {"columns": columns, "rows": rows}
+
+def validate_columnar_file(file_path, logger, required_columns=()):
+    """Validates a Parquet, Arrow IPC or `.npy` file from its schema alone and returns the schema."""
+    validate_file_path(file_path, logger, PARQUET_EXTENSIONS + FEATHER_EXTENSIONS + NUMPY_EXTENSIONS)
+    schema = read_columnar_schema(file_path)
+    if not schema["columns"]:
+        raise ValueError(f"File has no columns: {file_path}")
+    missing = [col for col in required_columns if col not in schema["columns"]]
+    if missing:
+        raise ValueError(f"Columns not found in {file_path}: {missing}")
+    logger.debug(f"Validated schema of {file_path}: {schema['rows']} rows, {len(schema['columns'])} columns.")
+    return schema
+
+def numpy_column_names(file_path, n_columns):
+    """Returns the column names of a `.npy` matrix.
+
+    They are read from a JSON list in a sidecar file next to it (`features.npy` ->
+    `features.columns.json`), falling back to `x0`, `x1`, ...
+    """
+    sidecar = os.path.splitext(file_path)[0] + ".columns.json"
+    if os.path.exists(sidecar):
+        with open(sidecar) as f:
+            names = [str(name) for name in json.load(f)]
+        if len(names) != n_columns:
+            raise ValueError(f"{sidecar} lists {len(names)} columns, but the matrix has {n_columns}.")
+        if len(set(names)) != len(names):
+            raise ValueError(f"{sidecar} has duplicate column names.")
+        return names
+    return [f"x{i}" for i in range(n_columns)]
+
+def import_pyarrow(file_path):
+    """Imports pyarrow, which is only needed for Parquet and Arrow files."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(f"Reading {file_path} requires pyarrow (pip install pyarrow).")
+    return pyarrow
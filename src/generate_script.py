@@ -1,19 +1,17 @@
-def generate_predict_script(output_dir, preprocess_called):
+import os
+
+def generate_predict_script(output_dir):
     script_content = """
 import argparse
-import os
 import logging
-import pandas as pd
-import joblib
-"""
+# The fitted DataPreprocessor inside the pipeline is unpickled from this package.
+import data_preprocessing
+from config_loader import ProfilingConfig
+from inference import DEFAULT_CHUNKSIZE, predict_file
+from profiling import configure_profiling, export_profile
 
-    if preprocess_called:
-        script_content += """
-from data_preprocessing.data_pre_processing import preprocess_data
-"""
-
-    script_content += """
-def predict(data_file, model_file, output_file, verbose, target_column=None):
+def predict(data_file, model_file, output_file, verbose, chunksize=DEFAULT_CHUNKSIZE,
+            id_columns=(), n_jobs=1, profile=None, profile_format="json"):
     try:
         if verbose:
             logging.basicConfig(level=logging.DEBUG,
@@ -25,50 +23,40 @@ def predict(data_file, model_file, output_file, verbose, target_column=None):
         logger = logging.getLogger(__name__)
 
         logger.info("Starting prediction process.")
+        if profile:
+            configure_profiling(ProfilingConfig(enabled=True, format=profile_format), logger)
 
-        # Load the trained full pipeline
-        full_pipeline = joblib.load(model_file)
-        logger.info(f"Full pipeline loaded from: {model_file}")
-
-        # Load the new data
-        new_data = pd.read_csv(data_file)
-"""
-
-    if preprocess_called:
-        script_content += """
-        # Preprocess the new data
-        preprocessed_data = preprocess_data(new_data, target_column, logger)
-        if target_column and target_column in preprocessed_data.columns:
-            preprocessed_data = preprocessed_data.drop(target_column, axis=1)
-
-        # Make predictions using the full pipeline
-        predictions = full_pipeline.predict(preprocessed_data)
-"""
-    else:
-        script_content += """
-        # Make predictions using the full pipeline
-        predictions = full_pipeline.predict(new_data)
-"""
-
-    script_content += """
-        # Save predictions to a CSV file
-        pd.DataFrame(predictions, columns=["prediction"]).to_csv(output_file, index=False)
-        logger.info(f"Predictions saved to: {output_file}")
+        # The input is streamed in chunks; each chunk goes through the fitted preprocessing
+        # and the model, and its predictions are appended to the output file, so memory
+        # stays bounded by the chunk size. The pipeline drops the training target column
+        # itself when the input still contains it.
+        rows = predict_file(model_file, data_file, output_file, logger,
+                            chunksize=chunksize, id_columns=id_columns, n_jobs=n_jobs)
+        logger.info(f"{rows} predictions saved to: {output_file}")
 
     except Exception as e:
         logging.error(f"Prediction failed: {e}")
         print(f"Prediction failed: {e}")
+    finally:
+        if profile:
+            export_profile(profile, logging.getLogger(__name__), profile_format)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Make predictions using a trained full pipeline.")
-    parser.add_argument("--data", "-d", required=True, help="Path to the new data CSV file.")
+    parser.add_argument("--data", "-d", required=True, help="Path to the new data file (CSV, Parquet, Feather/Arrow or .npy).")
     parser.add_argument("--model", "-m", required=True, help="Path to the trained full pipeline file.")
     parser.add_argument("--output", "-o", required=True, help="Path to the output CSV file for predictions.")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output.")
-    parser.add_argument("--target", "-t", help="Name of the target column.")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows read and predicted per chunk.")
+    parser.add_argument("--id-columns", nargs="+", default=[], help="Columns copied to the output to join predictions back.")
+    parser.add_argument("--n-jobs", type=int, default=1,
+                        help="Worker processes predicting chunks (-1 uses all cores); output keeps the input order.")
+    parser.add_argument("--profile", help="Write a per-chunk profile (wall time, CPU time, memory) to this file.")
+    parser.add_argument("--profile-format", choices=("json", "chrome"), default="json", help="Profile output format.")
     args = parser.parse_args()
 
-    predict(args.data, args.model, args.output, args.verbose, args.target)
+    predict(args.data, args.model, args.output, args.verbose, args.chunksize,
+            args.id_columns, args.n_jobs, args.profile, args.profile_format)
 """
 
     output_path = os.path.join(output_dir, "predict.py") if output_dir else "predict.py"
@@ -0,0 +1,82 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+from data_loader import iter_data_chunks
+from profiling import profile_stage
+
+# Rows per chunk when streaming predictions.
+DEFAULT_CHUNKSIZE = 100000
+
+# Pipeline loaded once per worker process by _init_worker.
+_worker_pipeline = None
+
+def predict_chunk(pipeline, chunk, id_columns=()):
+    """Predicts one chunk and returns its ID columns followed by a `prediction` column.
+
+    ID columns stay in the chunk: columns the preprocessor was not fitted on are
+    ignored by its transform.
+    """
+    result = chunk[list(id_columns)].reset_index(drop=True)
+    result["prediction"] = pipeline.predict(chunk)
+    return result
+
+def predict_file(model_file, data_file, output_file, logger, chunksize=DEFAULT_CHUNKSIZE, id_columns=(), n_jobs=1):
+    """Streams `data_file` through the full pipeline and appends predictions to `output_file`.
+
+    The input (CSV, Parquet, Arrow IPC or `.npy`) is read `chunksize` rows at a time and every
+    chunk's predictions are written as soon as they are ready, so peak memory depends on the
+    chunk size, not the file size.
+    With `n_jobs` > 1 chunks are predicted by a process pool that loads the pipeline once
+    per worker; at most 2 * `n_jobs` chunks are in flight and results are written in input
+    order. Returns the number of rows predicted.
+    """
+    chunks = iter_data_chunks(data_file, logger, chunksize)
+    if os.path.exists(output_file):
+        os.remove(output_file)
+
+    rows = 0
+    if n_jobs == 1:
+        pipeline = joblib.load(model_file)
+        logger.info(f"Full pipeline loaded from: {model_file}")
+        for chunk in chunks:
+            _check_id_columns(chunk, id_columns)
+            with profile_stage("predict_chunk", chunk) as record:
+                result = predict_chunk(pipeline, chunk, id_columns)
+                record.output(result)
+            rows += _append(result, output_file, rows)
+            logger.debug(f"Predicted {rows} rows.")
+        return rows
+
+    n_jobs = n_jobs if n_jobs > 0 else os.cpu_count()
+    logger.info(f"Predicting in {n_jobs} worker processes.")
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(model_file,)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            _check_id_columns(chunk, id_columns)
+            pending.append(executor.submit(_predict_in_worker, chunk, id_columns))
+            # Bound the chunks held in memory; the oldest result is written first to keep the input order.
+            if len(pending) >= 2 * n_jobs:
+                rows += _append(pending.popleft().result(), output_file, rows)
+                logger.debug(f"Predicted {rows} rows.")
+        while pending:
+            rows += _append(pending.popleft().result(), output_file, rows)
+    logger.debug(f"Predicted {rows} rows.")
+    return rows
+
+def _check_id_columns(chunk, id_columns):
+    missing = [col for col in id_columns if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"ID columns not found in the data: {missing}")
+
+def _append(result, output_file, rows_written):
+    """Appends a chunk of predictions, writing the header only for the first chunk."""
+    result.to_csv(output_file, mode="a", header=rows_written == 0, index=False)
+    return len(result)
+
+def _init_worker(model_file):
+    global _worker_pipeline
+    _worker_pipeline = joblib.load(model_file)
+
+def _predict_in_worker(chunk, id_columns):
+    return predict_chunk(_worker_pipeline, chunk, id_columns)
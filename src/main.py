@@ -1,30 +1,32 @@
 import argparse
 import os
 import logging
-import pandas as pd
-from data_validator import validate_csv_file
-from data_preprocessing.data_pre_processing import preprocess_data
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, mean_squared_error
-import pandas.api.types as ptypes
-import yaml
-from tpot import TPOTClassifier, TPOTRegressor
-import stopit
-import joblib
-from sklearn.pipeline import Pipeline
+from config_loader import load_config
+from reporting import configure_reporting, shutdown_reporting
+from profiling import configure_profiling, export_profile
+from training import train
 from generate_script import generate_predict_script
-# Global flag to track if preprocess_data was called
-preprocess_data_called = False
 
 def main():
     parser = argparse.ArgumentParser(description="AutoMLForge: Automated ML Pipeline")
-    parser.add_argument("--data", "-d", required=True, help="Path to the CSV file.")
+    parser.add_argument("--data", "-d", required=True, help="Path to the input file (CSV, Parquet, Feather/Arrow or .npy).")
     parser.add_argument("--target", "-t", help="Name of the target column.")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output.")
     parser.add_argument("--output", "-o", help="Path to the output directory.")
-    parser.add_argument("--download", action="store_true", help="Download the trained model and pipeline.")
+    parser.add_argument("--download", action="store_true",
+                        help="Kept for compatibility; the full pipeline is always saved to the output directory.")
+    parser.add_argument("--config", "-c", help="Path to the config YAML file (defaults to config/config.yaml next to main.py).")
+    parser.add_argument("--headless", action="store_true",
+                        help="Never prompt; accept the model only when it meets the metric threshold.")
+    parser.add_argument("--metric-threshold", type=float,
+                        help="Auto-accept at test accuracy >= threshold (classification) or MSE <= threshold (regression).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record wall time, CPU time, memory and shapes of every stage.")
+    parser.add_argument("--profile-format", choices=("json", "chrome"),
+                        help="Profile output format (defaults to profiling.format).")
     args = parser.parse_args()
 
+    config = None
     try:
         if args.output and not os.path.exists(args.output):
             os.makedirs(args.output)
@@ -42,72 +44,46 @@ def main():
 
         logger.info("Starting AutoMLForge pipeline.")
 
-        validate_csv_file(args.data, logger)
-        data = pd.read_csv(args.data)
+        # Parsed and validated once, then passed to every stage.
+        config = load_config(args.config)
+        logger.debug(f"Loaded config: {config}")
+        configure_reporting(config.reporting, args.output, logger, config.training.random_state)
+        configure_profiling(config.profiling, logger, enabled=args.profile or None)
 
-        if args.target:
-            target_column = args.target
-        elif "target" in data.columns:
-            target_column = "target"
-        elif "target_column" in data.columns:
-            target_column = "target_column"
-        else:
-            target_column = None
-
-        if target_column:
-
-            X = data.drop(target_column, axis=1)
-            y = data[target_column]
-
-            with open("config/config.yaml", "r") as file:
-                config = yaml.safe_load(file)
-            training_config = config["training"]
-
-            X_train, X_test, y_train, y_test = train_test_split(X, y,
-                                                                test_size=training_config["test_size"],
-                                                                random_state=training_config["random_state"])
-
-            # Track preprocess_data call
-            global preprocess_data_called
-            preprocess_data_called = True
-            data = preprocess_data(data, target_column, logger)
-
-            X = data.drop(target_column, axis=1)
-            y = data[target_column]
-
-            X_train, X_test, y_train, y_test = train_test_split(X, y,
-                                                                test_size=training_config["test_size"],
-                                                                random_state=training_config["random_state"])
-
-            # AutoML with TPOT and timeout
-            if ptypes.is_numeric_dtype(y):
-                tpot = TPOTRegressor(generations=5, population_size=20, verbosity=2, random_state=training_config["random_state"])
-            else:
-                tpot = TPOTClassifier(generations=5, population_size=20, verbosity=2, random_state=training_config["random_state"])
-
-            try:
-                with stopit.threading_timeoutable(default="timeout"):
-                    tpot.fit(X_train, y_train, timeout=600)
-                logger.info(f"TPOT best pipeline: {tpot.fitted_pipeline_}")
-            except stopit.TimeoutException:
-                logger.warning("TPOT training timed out.")
-                print("TPOT training timed out.")
-
-            # Make Predictions
-            y_pred = tpot.predict(X_test)
+        artifact = train(args.data, args.target, config, output_dir=args.output, logger=logger,
+                         metric_threshold=args.metric_threshold)
 
-            # Evaluate Model
-            if ptypes.is_numeric_dtype(y):
-                mse = mean_squared_error(y_test, y_pred)
-                logger.info(f"Mean Squared Error: {mse}")
-                print(f"Mean Squared Error: {mse}")
-            else:
-                accuracy = accuracy_score(y_test, y_pred)
-                logger.info(f"Accuracy: {accuracy}")
-                print(f"Accuracy: {accuracy}")
+        for name, value in artifact.metrics.items():
+            print(f"{name}: {value}")
 
-            # Ask user for satisfaction and generate predict.py
+        accepted = artifact.accepted
+        if accepted is None and not args.headless:
+            # Ask user for satisfaction only when no threshold decided it.
             satisfaction = input("Are you satisfied with the model's performance? (yes/no): ").lower()
-            if satisfaction == "yes":
-                generate_predict_script(args.output, preprocess_data_called)
-                logger.info(f"predict.py saved in {o}")
+            accepted = satisfaction == "yes"
+            if accepted:
+                generate_predict_script(args.output)
+
+        if accepted:
+            logger.info(f"predict.py saved in {args.output or '.'}")
+            return 0
+        if accepted is False:
+            logger.warning("Model rejected; predict.py was not generated.")
+            return 2
+        return 0
+
+    except Exception as e:
+        logging.error(f"AutoMLForge pipeline failed: {e}")
+        print(f"AutoMLForge pipeline failed: {e}")
+        return 1
+    finally:
+        # Diagnostic plots finish in the background; wait for them only once training is done.
+        shutdown_reporting(logging.getLogger(__name__))
+        if config is not None:
+            profile_format = args.profile_format or config.profiling.format
+            default_name = "profile.trace.json" if profile_format == "chrome" else "profile.json"
+            export_profile(config.profiling.output or os.path.join(args.output or ".", default_name),
+                           logging.getLogger(__name__), profile_format)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
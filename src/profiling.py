@@ -0,0 +1,170 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+# Module-level profiler, like the reporter: None means profiling is disabled.
+_profiler = None
+
+class _NullStage:
+    """Shared no-op stage returned while profiling is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def output(self, data):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    def __init__(self, profiler, name, data):
+        self.profiler = profiler
+        self.name = name
+        self.input_shape = _shape(data)
+        self.output_shape = None
+        self.peak_traced = 0
+
+    def output(self, data):
+        """Records the shape of the stage's result."""
+        self.output_shape = _shape(data)
+
+    def __enter__(self):
+        self.profiler._enter(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler._exit(self, failed=exc_info[0] is not None)
+        return False
+
+class Profiler:
+    """Records wall time, CPU time, memory and shapes of nested pipeline stages.
+
+    Memory is reported as the process RSS at the end of each stage and its peak so far.
+    With `trace_memory`, the peak of Python allocations during each stage, above what was
+    allocated when it started, is measured with tracemalloc as well. This is more precise
+    but slows allocation-heavy code.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._stack = []
+        self._origin = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name, data=None):
+        return _Stage(self, name, data)
+
+    def _enter(self, stage):
+        if self.trace_memory:
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_traced = max(parent.peak_traced, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            stage.start_traced = tracemalloc.get_traced_memory()[0]
+        self._stack.append(stage)
+        stage.start_wall = time.perf_counter()
+        stage.start_cpu = time.process_time()
+
+    def _exit(self, stage, failed=False):
+        wall = time.perf_counter() - stage.start_wall
+        cpu = time.process_time() - stage.start_cpu
+        self._stack.pop()
+        record = {"name": stage.name,
+                  "depth": len(self._stack),
+                  "start_s": round(stage.start_wall - self._origin, 6),
+                  "wall_s": round(wall, 6),
+                  "cpu_s": round(cpu, 6),
+                  "rss_mb": _rss_mb(),
+                  "max_rss_mb": _max_rss_mb(),
+                  "input_shape": stage.input_shape,
+                  "output_shape": stage.output_shape,
+                  "thread": threading.get_ident()}
+        if failed:
+            record["failed"] = True
+        if self.trace_memory:
+            stage.peak_traced = max(stage.peak_traced, tracemalloc.get_traced_memory()[1])
+            record["peak_traced_mb"] = round(max(stage.peak_traced - stage.start_traced, 0) / 1024 ** 2, 3)
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_traced = max(parent.peak_traced, stage.peak_traced)
+        self.records.append(record)
+
+    def to_json(self):
+        return {"stages": sorted(self.records, key=lambda record: record["start_s"])}
+
+    def to_chrome_trace(self):
+        """Returns the records as complete ("X") events of the Chrome trace event format."""
+        pid = os.getpid()
+        events = []
+        for record in self.to_json()["stages"]:
+            args = {key: value for key, value in record.items() if key not in ("name", "start_s", "wall_s", "thread")}
+            events.append({"name": record["name"], "ph": "X", "pid": pid, "tid": record["thread"],
+                           "ts": round(record["start_s"] * 1e6, 3), "dur": round(record["wall_s"] * 1e6, 3),
+                           "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+def configure_profiling(profiling_config, logger, enabled=None):
+    """Starts recording stages when profiling is enabled (`enabled` overrides the config)."""
+    global _profiler
+    enabled = profiling_config.enabled if enabled is None else enabled
+    _profiler = Profiler(profiling_config.trace_memory) if enabled else None
+    if enabled:
+        logger.debug(f"Profiling enabled (trace_memory={profiling_config.trace_memory}).")
+
+def profile_stage(name, data=None):
+    """Context manager recording one stage; `data` gives the input shape, `.output(df)` the output shape."""
+    if _profiler is None:
+        return _NULL_STAGE
+    return _profiler.stage(name, data)
+
+def stop_profiling():
+    """Stops recording and returns the profiler with its records, or None when profiling was disabled."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None and profiler.trace_memory:
+        tracemalloc.stop()
+    return profiler
+
+def export_profile(path, logger, format="json"):
+    """Writes the recorded stages as JSON or Chrome trace (chrome://tracing, Perfetto) and stops profiling."""
+    profiler = stop_profiling()
+    if profiler is None:
+        return None
+    profile = profiler.to_chrome_trace() if format == "chrome" else profiler.to_json()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2)
+    logger.info(f"Profile saved to: {path}")
+    return path
+
+def _shape(data):
+    shape = getattr(data, "shape", None)
+    return list(shape) if shape is not None else None
+
+def _rss_mb():
+    """Current resident set size in MB, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2, 3)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _max_rss_mb():
+    """Peak resident set size of the process so far in MB."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return round(max_rss / 1024 ** 2 if sys.platform == "darwin" else max_rss / 1024, 3)
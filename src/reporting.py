@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Module-level reporter, like the logging configuration: None means reporting is disabled.
+_reporter = None
+
+class Reporter:
+    """Renders diagnostic plots from sampled data in a background worker process.
+
+    Stages hand over a small sample and return immediately; matplotlib and seaborn
+    are only imported inside the worker, never in the training or inference process.
+    """
+
+    def __init__(self, output_dir, sample_rows, max_heatmap_columns, random_state):
+        self.output_dir = output_dir
+        self.sample_rows = sample_rows
+        self.max_heatmap_columns = max_heatmap_columns
+        self.random_state = random_state
+        self._executor = ProcessPoolExecutor(max_workers=1)
+        self._futures = []
+
+    def sample(self, data):
+        """Returns at most `sample_rows` rows of the numerical columns."""
+        data = data.select_dtypes(include=np.number)
+        if len(data) > self.sample_rows:
+            data = data.sample(n=self.sample_rows, random_state=self.random_state)
+        return data.copy()
+
+    def submit(self, render, *args):
+        self._futures.append((render.__name__, self._executor.submit(render, self.output_dir, *args)))
+
+    def close(self, logger, wait=True):
+        if wait:
+            for name, future in self._futures:
+                try:
+                    path = future.result()
+                    logger.debug(f"Report {name} saved to: {path}")
+                except Exception as e:
+                    logger.warning(f"Report {name} failed: {e}")
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        self._futures = []
+
+def configure_reporting(reporting_config, output_dir, logger, random_state=42):
+    """Starts the background reporter when reporting is enabled in the config."""
+    global _reporter
+    shutdown_reporting(logger)
+    if not reporting_config.enabled:
+        return
+    output_dir = reporting_config.output_dir or output_dir or "."
+    os.makedirs(output_dir, exist_ok=True)
+    _reporter = Reporter(output_dir, reporting_config.sample_rows, reporting_config.max_heatmap_columns, random_state)
+    logger.debug(f"Reporting enabled; plots will be written to: {output_dir}")
+
+def shutdown_reporting(logger, wait=True):
+    """Waits for pending reports (unless `wait` is False) and stops the worker."""
+    global _reporter
+    if _reporter is not None:
+        _reporter.close(logger, wait)
+        _reporter = None
+
+def report_outliers(data, bounds):
+    """Queues the outlier distribution plot for the columns that have outliers."""
+    if _reporter is None or bounds.empty:
+        return
+    bounds = bounds[bounds.index.isin(data.columns)]
+    sample = _reporter.sample(data[list(bounds.index)])
+    _reporter.submit(_render_outliers, sample, {col: (row.lower, row.upper) for col, row in bounds.iterrows()})
+
+def report_correlation(data):
+    """Queues the correlation heatmap of a sample of the numerical columns."""
+    if _reporter is None:
+        return
+    _reporter.submit(_render_correlation, _reporter.sample(data), _reporter.max_heatmap_columns)
+
+def _render_outliers(output_dir, sample, bounds):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    outlier_data = {}
+    for col, (lower_bound, upper_bound) in bounds.items():
+        values = sample[col]
+        outliers = values[(values < lower_bound) | (values > upper_bound)]
+        if not outliers.empty:
+            outlier_data[col] = outliers.reset_index(drop=True)
+    if not outlier_data:
+        return None
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    sns.boxplot(data=pd.DataFrame(outlier_data), ax=ax)
+    ax.set_title("Data Insights: Outlier Distribution")
+    path = os.path.join(output_dir, "data_insights.png")
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+def _render_correlation(output_dir, sample, max_columns):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    corr_matrix = sample.corr().abs()
+    if len(corr_matrix) > max_columns:
+        # Keep the columns with the strongest correlation to any other column.
+        strongest = corr_matrix.where(~np.eye(len(corr_matrix), dtype=bool)).max().nlargest(max_columns).index
+        corr_matrix = corr_matrix.loc[strongest, strongest]
+
+    fig, ax = plt.subplots(figsize=(12, 10))
+    sns.heatmap(corr_matrix, annot=len(corr_matrix) <= 20, cmap="coolwarm", ax=ax)
+    path = os.path.join(output_dir, "correlation_matrix.png")
+    fig.savefig(path)
+    plt.close(fig)
+    return path
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import time
+import joblib
+import pandas as pd
+import pandas.api.types as ptypes
+from deap import creator
+from tpot import TPOTClassifier, TPOTRegressor
+
+CHECKPOINT_FILENAME = "tpot_checkpoint.joblib"
+
+def run_search(X_train, y_train, search_config, logger, random_state=42, output_dir=None):
+    """Runs the TPOT pipeline search within a wall-clock budget and returns the fitted TPOT object.
+
+    Candidates are evaluated by `n_jobs` worker processes. The search runs in slices of
+    `checkpoint_every` generations, each limited to the remaining budget, so TPOT stops
+    cleanly with the best pipeline found so far once time runs out. After every slice the
+    population and evaluated pipelines are checkpointed; with `resume` set, a later run
+    continues from that checkpoint instead of starting over. A checkpoint is only resumed
+    when its fingerprint (training data, task and search settings) matches this search.
+    """
+    checkpoint_path = search_config.checkpoint_path or os.path.join(output_dir or ".", CHECKPOINT_FILENAME)
+    estimator = TPOTRegressor if ptypes.is_numeric_dtype(y_train) else TPOTClassifier
+    # warm_start keeps the population between slices instead of reinitializing it.
+    tpot = estimator(generations=1,
+                     population_size=search_config.population_size,
+                     n_jobs=search_config.n_jobs,
+                     max_eval_time_mins=search_config.max_eval_time_mins,
+                     verbosity=search_config.verbosity,
+                     random_state=random_state,
+                     warm_start=True)
+
+    fingerprint = search_fingerprint(X_train, y_train, estimator.__name__, search_config, random_state)
+    generations_done = 0
+    if search_config.resume and os.path.exists(checkpoint_path):
+        generations_done = restore_checkpoint(tpot, checkpoint_path, logger, fingerprint)
+
+    deadline = time.monotonic() + search_config.time_budget_seconds
+    logger.info(f"Searching pipelines with {estimator.__name__}: budget {search_config.time_budget_seconds}s, "
+                f"n_jobs={search_config.n_jobs}, population {search_config.population_size}.")
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            generations = search_config.checkpoint_every
+            if search_config.generations is not None:
+                generations = min(generations, search_config.generations - generations_done)
+            fitted = getattr(tpot, "fitted_pipeline_", None) is not None
+            if fitted and (generations <= 0 or remaining <= 0):
+                break
+            # A resumed search that already ran all its generations still needs one slice to fit the best pipeline.
+            generations = max(generations, 1)
+
+            tpot.generations = generations
+            tpot.max_time_mins = max(remaining, 1) / 60
+            # A different seed per slice, otherwise every slice would replay the same variation choices.
+            tpot.random_state = random_state + generations_done
+            tpot.fit(X_train, y_train)
+            generations_done += generations
+            save_checkpoint(tpot, generations_done, checkpoint_path, logger, fingerprint)
+
+            if time.monotonic() >= deadline:
+                logger.warning("TPOT search stopped: time budget exhausted. Keeping the best pipeline found so far.")
+                break
+    except KeyboardInterrupt:
+        logger.warning("TPOT search interrupted. Keeping the best pipeline found so far.")
+        if getattr(tpot, "fitted_pipeline_", None) is None:
+            raise
+
+    logger.info(f"TPOT search finished after {generations_done} generations.")
+    logger.info(f"TPOT best pipeline: {tpot.fitted_pipeline_}")
+    return tpot
+
+def search_fingerprint(X_train, y_train, estimator_name, search_config, random_state):
+    """Hashes what the checkpointed scores depend on: the training data, the task and the search settings.
+
+    The generation count and time budget are left out, so a search can be resumed with
+    a larger budget.
+    """
+    digest = hashlib.sha256()
+    for frame in (X_train, y_train):
+        frame = frame if isinstance(frame, (pd.DataFrame, pd.Series)) else pd.DataFrame(frame)
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+        columns = frame.dtypes.items() if isinstance(frame, pd.DataFrame) else [(frame.name, frame.dtype)]
+        digest.update(repr([(str(name), str(dtype)) for name, dtype in columns]).encode())
+    settings = (estimator_name, search_config.population_size, search_config.max_eval_time_mins, random_state)
+    digest.update(repr(settings).encode())
+    return digest.hexdigest()
+
+def save_checkpoint(tpot, generations_done, checkpoint_path, logger, fingerprint=None):
+    """Writes the current population and evaluated pipelines, replacing the previous checkpoint atomically."""
+    state = {"fingerprint": fingerprint,
+             "generations_done": generations_done,
+             "population": [str(individual) for individual in tpot._pop],
+             "evaluated_individuals": tpot.evaluated_individuals_}
+    directory = os.path.dirname(checkpoint_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{checkpoint_path}.tmp"
+    joblib.dump(state, temp_path)
+    os.replace(temp_path, checkpoint_path)
+    logger.debug(f"Search checkpoint ({generations_done} generations) saved to: {checkpoint_path}")
+
+def restore_checkpoint(tpot, checkpoint_path, logger, fingerprint=None):
+    """Seeds `tpot` with a checkpointed population and returns the generations already run.
+
+    Pipelines evaluated before the checkpoint keep their scores and are not refitted, so
+    a checkpoint whose fingerprint differs from `fingerprint` is ignored (returning 0);
+    the new search overwrites it.
+    """
+    state = joblib.load(checkpoint_path)
+    if state.get("fingerprint") != fingerprint:
+        logger.warning(f"Ignoring search checkpoint {checkpoint_path}: it was made with different data, "
+                       f"task or search settings. Starting a new search.")
+        return 0
+    # Builds the primitive set needed to parse the stored pipelines; with warm_start the
+    # state set up here survives the _fit_init call at the start of fit.
+    tpot._fit_init()
+    population = []
+    for pipeline in state["population"]:
+        try:
+            population.append(creator.Individual.from_string(pipeline, tpot._pset))
+        except Exception as e:
+            logger.warning(f"Skipping checkpointed pipeline that cannot be restored: {e}")
+    tpot._pop = population
+    tpot.evaluated_individuals_.update(state["evaluated_individuals"])
+    logger.info(f"Resuming search from {checkpoint_path}: {state['generations_done']} generations, "
+                f"{len(population)} pipelines.")
+    return state["generations_done"]
@@ -0,0 +1,451 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+import joblib
+import numpy as np
+import pandas as pd
+from config_loader import load_config
+
+# The fitted DataPreprocessor inside the pipeline is unpickled from this package.
+import data_preprocessing
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+class PipelineCache:
+    """LRU cache of loaded pipelines keyed by artifact path and content hash.
+
+    A rewritten artifact gets a new hash and is loaded again; file hashes are only
+    recomputed when the file's mtime or size changes.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._pipelines = OrderedDict()
+        self._hashes = {}
+
+    def known_key(self, path):
+        """Returns the key when the file is unchanged since it was last hashed, otherwise None."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != (stat.st_mtime_ns, stat.st_size):
+            return None
+        return path, cached[1]
+
+    def key(self, path):
+        """Returns (path, sha256), hashing the file when it changed; slow for large artifacts."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != signature:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            cached = self._hashes[path] = (signature, digest.hexdigest())
+        return path, cached[1]
+
+    def get(self, key):
+        pipeline = self._pipelines.get(key)
+        if pipeline is not None:
+            self._pipelines.move_to_end(key)
+        return pipeline
+
+    def put(self, key, pipeline):
+        """Stores a pipeline and returns the keys evicted to stay within `max_size`."""
+        self._pipelines[key] = pipeline
+        self._pipelines.move_to_end(key)
+        evicted = []
+        while len(self._pipelines) > self.max_size:
+            evicted.append(self._pipelines.popitem(last=False)[0])
+        return evicted
+
+class ServingStats:
+    """Request counters and a sliding window of latencies for p50/p99 reporting."""
+
+    def __init__(self, window):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.rows = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.started = time.monotonic()
+
+    def record_request(self, latency, rows, ok=True):
+        self.requests += 1
+        if ok:
+            self.rows += rows
+            self.latencies.append(latency)
+        else:
+            self.errors += 1
+
+    def record_batch(self, requests):
+        self.batches += 1
+        self.batched_requests += requests
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        latencies = np.asarray(self.latencies) * 1000
+        return {"requests": self.requests,
+                "errors": self.errors,
+                "rows": self.rows,
+                "uptime_s": round(uptime, 3),
+                "requests_per_s": round(self.requests / uptime, 2) if uptime else 0.0,
+                "rows_per_s": round(self.rows / uptime, 2) if uptime else 0.0,
+                "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+                "latency_p99_ms": round(float(np.percentile(latencies, 99)), 3) if len(latencies) else None,
+                "mean_batch_requests": round(self.batched_requests / self.batches, 2) if self.batches else None}
+
+class MicroBatcher:
+    """Merges concurrent requests for one pipeline into a single vectorized predict call.
+
+    A batch is closed after `max_delay` seconds or once it holds `max_rows` rows. While
+    a batch is being predicted new requests queue up and form the next one. When a merged
+    batch fails, its requests are retried one by one so a bad payload only fails itself.
+    """
+
+    def __init__(self, pipeline, max_rows, max_delay, stats):
+        self.pipeline = pipeline
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.stats = stats
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    async def predict(self, frame):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((frame, future))
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return await future
+
+    def close(self):
+        """Stops the batcher once the requests queued so far have been answered."""
+        if self._task is not None:
+            self._queue.put_nowait(None)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            rows = len(item[0])
+            deadline = loop.time() + self.max_delay
+            while rows < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+
+            frame = pd.concat([frame for frame, _ in batch], ignore_index=True)
+            try:
+                # Prediction runs in a thread so the event loop keeps accepting requests.
+                predictions = await loop.run_in_executor(None, self.pipeline.predict, frame)
+            except Exception:
+                await self._predict_each(batch)
+                continue
+            self.stats.record_batch(len(batch))
+            start = 0
+            for request_frame, future in batch:
+                stop = start + len(request_frame)
+                if not future.done():
+                    future.set_result(predictions[start:stop])
+                start = stop
+
+    async def _predict_each(self, batch):
+        """Predicts the requests of a failed batch one by one, so only the failing ones get the error."""
+        loop = asyncio.get_running_loop()
+        for frame, future in batch:
+            try:
+                predictions = await loop.run_in_executor(None, self.pipeline.predict, frame)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self.stats.record_batch(1)
+            if not future.done():
+                future.set_result(predictions)
+
+class ModelServer:
+    """Long-lived asyncio scoring service speaking minimal HTTP/1.1 over TCP or a Unix socket.
+
+    Endpoints: `POST /predict` with `{"records": [...], "model": "path"}` (the model defaults
+    to the one given at startup), `GET /stats` and `GET /health`. Loading a pipeline
+    unpickles it, so a request may only name artifacts inside `serving.models_dir`.
+    """
+
+    def __init__(self, serving_config, logger, default_model=None):
+        self.config = serving_config
+        self.logger = logger
+        self.default_model = default_model
+        self.cache = PipelineCache(serving_config.cache_size)
+        self.stats = ServingStats(serving_config.stats_window)
+        self._batchers = {}
+        self._load_locks = {}
+
+    async def start(self, host=None, port=None, unix_socket=None):
+        if self.default_model:
+            await self.batcher(self.default_model)
+        unix_socket = unix_socket or self.config.unix_socket
+        if unix_socket:
+            server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+            self.logger.info(f"Serving on unix socket {unix_socket}")
+        else:
+            server = await asyncio.start_server(self._handle, host or self.config.host,
+                                                self.config.port if port is None else port)
+            self.logger.info(f"Serving on http://{server.sockets[0].getsockname()[0]}:{server.sockets[0].getsockname()[1]}")
+        return server
+
+    def close(self):
+        for batcher in self._batchers.values():
+            batcher.close()
+
+    def resolve_model(self, model):
+        """Returns the artifact path for a request's `model`, which must lie inside `models_dir`."""
+        if not model:
+            if not self.default_model:
+                raise ValueError("No model given and no default model configured.")
+            return self.default_model
+        if not isinstance(model, str):
+            raise ValueError("'model' must be a path string.")
+        if self.default_model and os.path.realpath(model) == os.path.realpath(self.default_model):
+            return self.default_model
+        if not self.config.models_dir:
+            raise PermissionError("Only the default model can be served; set serving.models_dir to allow others.")
+        models_dir = os.path.realpath(self.config.models_dir)
+        path = os.path.realpath(os.path.join(models_dir, model))
+        if not path.startswith(models_dir + os.sep):
+            raise PermissionError(f"Model '{model}' is outside the models directory.")
+        return path
+
+    async def batcher(self, model_path):
+        """Returns the batcher of a cached pipeline, hashing and loading it in a thread on a cache miss."""
+        loop = asyncio.get_running_loop()
+        key = self.cache.known_key(model_path) or await loop.run_in_executor(None, self.cache.key, model_path)
+        pipeline = self.cache.get(key)
+        if pipeline is None:
+            lock = self._load_locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                pipeline = self.cache.get(key)
+                if pipeline is None:
+                    start = time.perf_counter()
+                    pipeline = await loop.run_in_executor(None, joblib.load, key[0])
+                    for evicted in self.cache.put(key, pipeline):
+                        self._batchers.pop(evicted).close()
+                        self._load_locks.pop(evicted, None)
+                    self._batchers[key] = MicroBatcher(pipeline, self.config.max_batch_rows,
+                                                       self.config.max_batch_delay_ms / 1000, self.stats)
+                    self.logger.info(f"Loaded pipeline {key[0]} ({key[1][:12]}) in {time.perf_counter() - start:.2f}s")
+        return self._batchers[key]
+
+    async def predict(self, payload):
+        model_path = self.resolve_model(payload.get("model"))
+        records = payload.get("records")
+        if not isinstance(records, list) or not records:
+            raise ValueError("'records' must be a non-empty list of objects.")
+        batcher = await self.batcher(model_path)
+        predictions = await batcher.predict(pd.DataFrame.from_records(records))
+        return np.asarray(predictions).tolist()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_http_message(reader)
+                except ValueError as e:
+                    # The rest of a malformed message cannot be framed, so the connection is closed.
+                    _write_http_response(writer, 400, {"error": str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_http_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancellation only happens at shutdown, while an idle keep-alive connection waits.
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            return 200, self.stats.snapshot()
+        if path != "/predict":
+            return 404, {"error": f"Unknown path: {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST for /predict."}
+
+        start = time.perf_counter()
+        rows = 0
+        try:
+            payload = json.loads(body or b"{}")
+            rows = len(payload.get("records") or [])
+            predictions = await self.predict(payload)
+        except PermissionError as e:
+            self.stats.record_request(time.perf_counter() - start, rows, ok=False)
+            return 403, {"error": str(e)}
+        except (ValueError, KeyError, FileNotFoundError) as e:
+            self.stats.record_request(time.perf_counter() - start, rows, ok=False)
+            return 400, {"error": str(e)}
+        except Exception as e:
+            self.logger.error(f"Prediction failed: {e}")
+            self.stats.record_request(time.perf_counter() - start, rows, ok=False)
+            return 500, {"error": str(e)}
+        self.stats.record_request(time.perf_counter() - start, rows)
+        return 200, {"predictions": predictions}
+
+async def _read_http_message(reader):
+    """Reads one HTTP message and returns the first two start-line tokens, headers and body, or None at EOF.
+
+    For a request the tokens are the method and path; for a response, the version and status.
+    Raises ValueError for a start line without both tokens or an invalid Content-Length.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) < 2:
+        raise ValueError(f"Malformed start line: {line.decode('latin-1').strip()!r}")
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = headers.get("content-length", "0")
+    if not (length.isascii() and length.isdigit()):
+        raise ValueError(f"Invalid Content-Length: {length!r}")
+    body = await reader.readexactly(int(length)) if int(length) else b""
+    return parts[0], parts[1], headers, body
+
+def _write_http_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode() + body)
+
+async def request(reader, writer, method, path, payload=None):
+    """Sends one request over an open keep-alive connection and returns (status, payload)."""
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    _, status, _, response = await _read_http_message(reader)
+    return int(status), json.loads(response)
+
+async def self_test(model_path, data_file, serving_config, logger, n_requests=200, concurrency=16, rows_per_request=1):
+    """Starts the server on a free local port, fires concurrent requests at it and returns its stats.
+
+    Next to the sampled rows, single records with null fields are sent concurrently and
+    must succeed too. Needs nothing but the pipeline and a CSV of sample rows.
+    """
+    records = json.loads(pd.read_csv(data_file, nrows=max(rows_per_request * 10, 100)).to_json(orient="records"))
+    server = ModelServer(serving_config, logger, default_model=model_path)
+    listener = await server.start(host="127.0.0.1", port=0)
+    host, port = listener.sockets[0].getsockname()[:2]
+    counter = iter(range(n_requests))
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in counter:
+                start = (i * rows_per_request) % len(records)
+                status, response = await request(reader, writer, "POST", "/predict",
+                                                 {"records": records[start:start + rows_per_request]})
+                if status != 200:
+                    raise RuntimeError(f"Self-test request failed ({status}): {response.get('error')}")
+        finally:
+            writer.close()
+
+    async def null_fields_client():
+        # Single records with one or all fields null must score like any other record.
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            nulls = [{**records[0], field: None} for field in records[0]] + [dict.fromkeys(records[0])]
+            for record in nulls:
+                status, response = await request(reader, writer, "POST", "/predict", {"records": [record]})
+                if status != 200:
+                    raise RuntimeError(f"Self-test request with null fields failed ({status}): {response.get('error')}")
+        finally:
+            writer.close()
+
+    try:
+        await asyncio.gather(null_fields_client(), *(client() for _ in range(concurrency)))
+        reader, writer = await asyncio.open_connection(host, port)
+        _, stats = await request(reader, writer, "GET", "/stats")
+        writer.close()
+    finally:
+        listener.close()
+        await listener.wait_closed()
+        server.close()
+    return stats
+
+async def serve(model_path, serving_config, logger, host=None, port=None, unix_socket=None):
+    server = ModelServer(serving_config, logger, default_model=model_path)
+    listener = await server.start(host, port, unix_socket)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve trained full pipelines over HTTP.")
+    parser.add_argument("--model", "-m", help="Default full pipeline file served by /predict.")
+    parser.add_argument("--config", "-c", help="Path to the config YAML file.")
+    parser.add_argument("--host", help="Host to bind (defaults to serving.host).")
+    parser.add_argument("--port", type=int, help="Port to bind (defaults to serving.port).")
+    parser.add_argument("--unix-socket", help="Serve on this Unix socket instead of TCP.")
+    parser.add_argument("--self-test", metavar="CSV",
+                        help="Start a local server, send concurrent requests built from this CSV and print the stats.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests sent by --self-test.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients used by --self-test.")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(__name__)
+    serving_config = load_config(args.config).serving
+
+    if args.self_test:
+        if not args.model:
+            parser.error("--self-test needs --model.")
+        stats = asyncio.run(self_test(args.model, args.self_test, serving_config, logger,
+                                      n_requests=args.requests, concurrency=args.concurrency))
+        print(json.dumps(stats, indent=2))
+        return
+    try:
+        asyncio.run(serve(args.model, serving_config, logger, args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        logger.info("Server stopped.")
+
+if __name__ == "__main__":
+    main()
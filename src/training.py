@@ -0,0 +1,157 @@
+import dataclasses
+import json
+import logging
+import os
+import time
+import typing
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import joblib
+import pandas as pd
+import pandas.api.types as ptypes
+from sklearn.metrics import accuracy_score, mean_squared_error
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from config_loader import load_config
+from data_loader import load_data
+from data_preprocessing.data_preprocessor import DataPreprocessor
+from data_preprocessing.handle_missing_data import drop_sparse_missing_rows
+from generate_script import generate_predict_script
+from profiling import profile_stage
+from search import run_search
+
+PIPELINE_FILENAME = "full_pipeline.joblib"
+REPORT_FILENAME = "run_report.json"
+
+@dataclass
+class TrainedArtifact:
+    """Result of a training run: the fitted full pipeline and what is known about it."""
+    pipeline: Pipeline
+    target_column: str
+    task: str
+    metrics: dict
+    accepted: typing.Optional[bool]
+    pipeline_path: str
+    report_path: str
+    stage_timings: dict = field(default_factory=dict)
+
+def train(data, target_column=None, config=None, output_dir=None, logger=None, metric_threshold=None):
+    """Trains and persists a full pipeline without any user interaction.
+
+    `data` is a DataFrame or a path to a CSV, Parquet, Arrow IPC or `.npy` file. The fitted
+    pipeline is always saved to `full_pipeline.joblib` and a JSON run report with per-stage
+    timings to `run_report.json` in `output_dir`. With a `metric_threshold` (argument or `training.metric_threshold`) the
+    model is accepted when its test accuracy reaches it (classification) or its test MSE
+    stays at or below it (regression), and predict.py is generated; without one `accepted`
+    is None and the decision is left to the caller.
+    """
+    logger = logger or logging.getLogger(__name__)
+    config = config or load_config()
+    training_config = config.training
+    if metric_threshold is None:
+        metric_threshold = training_config.metric_threshold
+    output_dir = output_dir or "."
+    os.makedirs(output_dir, exist_ok=True)
+    timings = {}
+
+    with _timed(timings, "load", logger):
+        if not isinstance(data, pd.DataFrame):
+            data = load_data(data, logger,
+                             optimize_dtypes=config.data_loading.optimize_dtypes,
+                             sample_rows=config.data_loading.sample_rows,
+                             cache_dir=config.data_loading.cache_dir)
+        target_column = resolve_target_column(data, target_column)
+        # Row drops are a training-only step; the fitted preprocessor never drops rows.
+        data = data.dropna(subset=[target_column])
+        data = drop_sparse_missing_rows(data, logger, config.missing_values.drop_rows_max_percentage)
+
+    X = data.drop(target_column, axis=1)
+    y = data[target_column]
+    task = "regression" if ptypes.is_numeric_dtype(y) else "classification"
+    X_train, X_test, y_train, y_test = train_test_split(X, y,
+                                                        test_size=training_config.test_size,
+                                                        random_state=training_config.random_state)
+
+    # Learn preprocessing statistics on the training split only and replay them on the test split.
+    preprocessor = DataPreprocessor(target_column=target_column, config=config)
+    with _timed(timings, "preprocess_fit", logger):
+        X_train = preprocessor.fit_transform(X_train, y_train)
+    with _timed(timings, "preprocess_transform", logger):
+        X_test = preprocessor.transform(X_test)
+
+    with _timed(timings, "search", logger):
+        tpot = run_search(X_train, y_train, training_config.search, logger,
+                          random_state=training_config.random_state, output_dir=output_dir)
+
+    with _timed(timings, "evaluate", logger):
+        with profile_stage("predict", X_test) as record:
+            y_pred = tpot.fitted_pipeline_.predict(X_test)
+            record.output(y_pred)
+        if task == "regression":
+            metrics = {"mse": float(mean_squared_error(y_test, y_pred))}
+        else:
+            metrics = {"accuracy": float(accuracy_score(y_test, y_pred))}
+    logger.info(f"Test metrics: {metrics}")
+
+    accepted = None
+    if metric_threshold is not None:
+        if task == "regression":
+            accepted = metrics["mse"] <= metric_threshold
+        else:
+            accepted = metrics["accuracy"] >= metric_threshold
+        logger.info(f"Model {'accepted' if accepted else 'rejected'} against threshold {metric_threshold}.")
+
+    # Preprocessing and model are persisted together so inference is a single transform + predict.
+    full_pipeline = Pipeline([("preprocessor", preprocessor), ("model", tpot.fitted_pipeline_)])
+    pipeline_path = os.path.join(output_dir, PIPELINE_FILENAME)
+    with _timed(timings, "persist", logger):
+        joblib.dump(full_pipeline, pipeline_path)
+        if accepted:
+            generate_predict_script(output_dir)
+    logger.info(f"Full pipeline saved to: {pipeline_path}")
+
+    artifact = TrainedArtifact(pipeline=full_pipeline, target_column=target_column, task=task, metrics=metrics,
+                               accepted=accepted, pipeline_path=pipeline_path,
+                               report_path=os.path.join(output_dir, REPORT_FILENAME), stage_timings=timings)
+    write_run_report(artifact, config, metric_threshold, str(tpot.fitted_pipeline_),
+                     {"rows": len(data), "train_rows": len(X_train), "test_rows": len(X_test),
+                      "features_in": X.shape[1], "features_out": X_train.shape[1]})
+    logger.info(f"Run report saved to: {artifact.report_path}")
+    return artifact
+
+def resolve_target_column(data, target_column=None):
+    """Returns the target column: the given one, else a column named 'target' or 'target_column'."""
+    if target_column:
+        if target_column not in data.columns:
+            raise ValueError(f"Target column '{target_column}' not found in the data.")
+        return target_column
+    for candidate in ("target", "target_column"):
+        if candidate in data.columns:
+            return candidate
+    raise ValueError("No target column given and none named 'target' or 'target_column' found.")
+
+def write_run_report(artifact, config, metric_threshold, best_pipeline, shapes):
+    """Writes the JSON run report next to the persisted pipeline."""
+    report = {"target_column": artifact.target_column,
+              "task": artifact.task,
+              "metrics": artifact.metrics,
+              "metric_threshold": metric_threshold,
+              "accepted": artifact.accepted,
+              "pipeline_path": artifact.pipeline_path,
+              "best_pipeline": best_pipeline,
+              "shapes": shapes,
+              "stage_timings": artifact.stage_timings,
+              "config": dataclasses.asdict(config)}
+    with open(artifact.report_path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+
+@contextmanager
+def _timed(timings, stage, logger):
+    """Times a stage for the run report; it is also recorded when profiling is enabled."""
+    start = time.perf_counter()
+    try:
+        with profile_stage(stage):
+            yield
+    finally:
+        timings[stage] = round(time.perf_counter() - start, 4)
+        logger.debug(f"Stage '{stage}' took {timings[stage]:.2f}s.")